@@ -1,6 +1,6 @@
 """AI agents for OptimizeDeFi."""
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, preload_encodings, precount_system_prompts
 from app.agents.config import (
     AgentType,
     AgentConfig,
@@ -16,6 +16,8 @@ from app.agents.general import GeneralAgent
 __all__ = [
     # Base
     "BaseAgent",
+    "preload_encodings",
+    "precount_system_prompts",
     
     # Config
     "AgentType",
@@ -1,17 +1,35 @@
 """Base agent class with metrics integration."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, Tuple, Union
+from collections import OrderedDict, deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Dict, Any, Optional, List, Tuple, Union, Iterable, FrozenSet, Mapping
+)
+import asyncio
+import itertools
+import json
 import time
-import uuid
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from openai import AsyncOpenAI
+from langchain_core.messages import (
+    BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage,
+    convert_to_openai_messages
+)
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnablePassthrough
+from langchain_core.runnables.config import ensure_config, merge_configs
 from langchain_core.tools import Tool
 from langchain_core.callbacks import BaseCallbackHandler
 import tiktoken
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the stdlib encoder
+    orjson = None
+
+from app.agents.config import AgentConfig
 from app.core.config import settings
 from app.services.metrics import metrics_collector
 from app.services.cost_calculator import cost_calculator
@@ -19,6 +37,193 @@ from app.services.rate_limit_manager import rate_limit_manager
 from app.services.performance_logger import performance_logger
 
 
+@lru_cache(maxsize=32)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Get the shared token encoding for a model.
+    
+    Loading a BPE vocabulary is expensive, so encodings are cached per model
+    and shared across all agent instances.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        Token encoding (falls back to cl100k_base for unknown models)
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def preload_encodings(models: Iterable[str]) -> None:
+    """
+    Eagerly load token encodings so the first request doesn't pay for it.
+    
+    Args:
+        models: Model names to load encodings for
+    """
+    for model in models:
+        _get_encoding(model)
+
+
+# Token counts keyed by (encoding name, content). Multi-turn chats resend the
+# same history every turn, so most messages are counted only once.
+_TOKEN_COUNT_CACHE_SIZE = 4096
+_token_count_cache: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+
+def _count_tokens_cached(encoding: tiktoken.Encoding, contents: List[str]) -> List[int]:
+    """
+    Count tokens for multiple texts, reusing previously computed counts.
+    
+    Args:
+        encoding: Token encoding to use
+        contents: Texts to count
+        
+    Returns:
+        Token count for each text
+    """
+    counts: List[Optional[int]] = []
+    missing: List[int] = []
+    
+    for i, content in enumerate(contents):
+        key = (encoding.name, content)
+        count = _token_count_cache.get(key)
+        if count is None:
+            missing.append(i)
+        else:
+            _token_count_cache.move_to_end(key)
+        counts.append(count)
+    
+    if missing:
+        # Encode all cache misses in one batched call
+        encoded = encoding.encode_batch(
+            [contents[i] for i in missing],
+            num_threads=4
+        )
+        for i, tokens in zip(missing, encoded, strict=True):
+            counts[i] = len(tokens)
+            _token_count_cache[(encoding.name, contents[i])] = len(tokens)
+        
+        while len(_token_count_cache) > _TOKEN_COUNT_CACHE_SIZE:
+            _token_count_cache.popitem(last=False)
+    
+    return counts
+
+
+def _content_text(content: Union[str, List[Any]]) -> str:
+    """
+    Get the text of message content for token counting.
+    
+    Args:
+        content: Message content, a string or a list of content blocks
+        
+    Returns:
+        Concatenated text of the content
+    """
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else str(block.get("text", ""))
+        for block in content
+        if isinstance(block, (str, dict))
+    )
+
+
+def precount_system_prompts(configs: Iterable[AgentConfig]) -> None:
+    """
+    Count tokens for all static system prompts up front.
+    
+    Prompts are grouped by encoding and each group is encoded in one batched
+    call, priming the token count cache that agents read on construction.
+    
+    Args:
+        configs: Agent configurations whose system prompts to count
+    """
+    prompts_by_model: Dict[str, List[str]] = {}
+    for config in configs:
+        if config.system_prompt:
+            prompts_by_model.setdefault(config.model, []).append(config.system_prompt)
+    
+    prompts_by_encoding: Dict[str, Tuple[tiktoken.Encoding, List[str]]] = {}
+    for model, prompts in prompts_by_model.items():
+        encoding = _get_encoding(model)
+        prompts_by_encoding.setdefault(encoding.name, (encoding, []))[1].extend(prompts)
+    
+    for encoding, prompts in prompts_by_encoding.values():
+        _count_tokens_cached(encoding, prompts)
+
+
+def dumps_json(data: Any, indent: bool = False) -> str:
+    """
+    Serialize data for a prompt, using orjson when it is installed.
+    
+    Output is compact unless indent is set; models don't need the
+    whitespace, and it only adds tokens. Keys are sorted so equal data
+    always produces the same prompt text.
+    
+    Args:
+        data: JSON-serializable data (other values are stringified)
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        JSON string with stable key order
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=str, option=option).decode()
+        except TypeError:
+            # orjson rejects integers wider than 64 bits (e.g. raw wei amounts)
+            pass
+    if indent:
+        return json.dumps(data, indent=2, sort_keys=True, default=str)
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, default=str)
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+    
+    Args:
+        data: JSON text
+        
+    Returns:
+        Parsed value
+        
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Display names for supported chain IDs
+CHAIN_NAMES: Mapping[int, str] = MappingProxyType({
+    1: "Ethereum",
+    137: "Polygon",
+    10: "Optimism",
+    42161: "Arbitrum",
+    56: "BSC",
+    43114: "Avalanche"
+})
+
+
+def get_chain_name(chain_id: int) -> str:
+    """Get the display name for a chain ID."""
+    return CHAIN_NAMES.get(chain_id) or f"Chain {chain_id}"
+
+
+# Process-wide request sequence; shared by all agents so IDs stay unique even
+# when several instances use the same agent name.
+_request_counter = itertools.count()
+
+
 class MetricsCallbackHandler(BaseCallbackHandler):
     """Callback handler for collecting metrics during LLM calls."""
     
@@ -32,6 +237,10 @@ class MetricsCallbackHandler(BaseCallbackHandler):
         """
         self.agent_name = agent_name
         self.model = model
+        self.reset()
+    
+    def reset(self):
+        """Clear per-call state so the handler can be reused."""
         self.start_time: Optional[float] = None
         self.prompt_tokens: int = 0
         self.completion_tokens: int = 0
@@ -46,8 +255,9 @@ class MetricsCallbackHandler(BaseCallbackHandler):
             duration = time.time() - self.start_time
             
             # Extract token usage if available
-            if hasattr(response, 'llm_output') and response.llm_output:
-                usage = response.llm_output.get('token_usage', {})
+            llm_output = getattr(response, 'llm_output', None)
+            if llm_output:
+                usage = llm_output.get('token_usage', {})
                 self.prompt_tokens = usage.get('prompt_tokens', 0)
                 self.completion_tokens = usage.get('completion_tokens', 0)
             
@@ -92,11 +302,30 @@ class BaseAgent(ABC):
         self.tools = tools or []
         self.system_prompt = system_prompt or self._get_default_system_prompt()
         
+        # Run the tool calls from one model turn concurrently; they are
+        # independent by construction (the model issued them together)
+        self.parallel_tools = True
+        
         # Initialize LLM
         self.llm = self._create_llm()
         
+        # LLMs with tools bound, keyed by tool names (binding rebuilds schemas)
+        self._bound_llm_cache: Dict[FrozenSet[str], Any] = {}
+        
+        # Idle metrics handlers; each LLM call gets its own so state never
+        # leaks between concurrent calls
+        self._handler_pool: deque = deque()
+        
         # Initialize token encoder
         self._init_tokenizer()
+        
+        # System prompt is static, so build its message and count its tokens
+        # (plus overhead) once
+        self._system_message = self._build_system_message()
+        self._system_prompt_tokens = _count_tokens_cached(
+            self.encoding,
+            [self.system_prompt]
+        )[0] + 4
     
     def _create_llm(self) -> ChatOpenAI:
         """Create the LLM instance with OpenRouter."""
@@ -109,18 +338,45 @@ class BaseAgent(ABC):
             default_headers={
                 "HTTP-Referer": "https://optimizedefi.com",
                 "X-Title": "OptimizeDeFi"
-            },
-            callbacks=[MetricsCallbackHandler(self.name, self.model)]
+            }
         )
     
+    def _acquire_callback_handler(self) -> MetricsCallbackHandler:
+        """Get a clean metrics handler for a single LLM call."""
+        if self._handler_pool:
+            handler = self._handler_pool.pop()
+            handler.reset()
+            return handler
+        return MetricsCallbackHandler(self.name, self.model)
+    
+    def _release_callback_handler(self, handler: MetricsCallbackHandler):
+        """Return a metrics handler to the pool."""
+        self._handler_pool.append(handler)
+    
+    def _llm_call_config(
+        self,
+        handler: MetricsCallbackHandler,
+        **kwargs: Any
+    ) -> RunnableConfig:
+        """
+        Build the config for a single LLM call.
+        
+        The metrics handler is added to the callbacks inherited from the
+        current run (e.g. a LangGraph node) rather than replacing them, so
+        tracing and stream events still propagate.
+        
+        Args:
+            handler: Metrics handler for this call
+            **kwargs: Additional config entries
+            
+        Returns:
+            Runnable config
+        """
+        return merge_configs(ensure_config(), {"callbacks": [handler], **kwargs})
+    
     def _init_tokenizer(self):
         """Initialize the token encoder for counting tokens."""
-        try:
-            # Try to get encoding for the model
-            self.encoding = tiktoken.encoding_for_model(self.model)
-        except:
-            # Fallback to cl100k_base encoding
-            self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.encoding = _get_encoding(self.model)
     
     def _count_tokens(self, text: str) -> int:
         """Count tokens in text."""
@@ -128,13 +384,60 @@ class BaseAgent(ABC):
     
     def _estimate_tokens(self, messages: List[BaseMessage]) -> int:
         """Estimate tokens for a list of messages."""
-        total = 0
-        for msg in messages:
-            # Add message content
-            total += self._count_tokens(msg.content)
-            # Add overhead for message structure
-            total += 4  # Approximate overhead per message
-        return total
+        if not messages:
+            return 0
+        
+        counts = _count_tokens_cached(
+            self.encoding,
+            [_content_text(msg.content) for msg in messages]
+        )
+        
+        # Add approximate overhead of 4 tokens per message structure
+        return sum(counts) + 4 * len(messages)
+    
+    def _prepare_messages(
+        self,
+        messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], int]:
+        """
+        Prepend the system prompt if needed and estimate input tokens.
+        
+        Args:
+            messages: Input messages
+            
+        Returns:
+            Tuple of (messages with system prompt, estimated tokens)
+        """
+        if messages and messages[0] is self._system_message:
+            # Already prepared (e.g. a tool follow-up replaying the messages)
+            return messages, self._system_prompt_tokens + self._estimate_tokens(messages[1:])
+        
+        if messages and isinstance(messages[0], SystemMessage):
+            return messages, self._estimate_tokens(messages)
+        
+        # Reuse the shared system message and its precomputed token count
+        estimated_tokens = self._system_prompt_tokens + self._estimate_tokens(messages)
+        return [self._system_message, *messages], estimated_tokens
+    
+    def _build_system_message(self) -> SystemMessage:
+        """
+        Build the system message for the agent.
+        
+        The system prompt is static and always sent first, so it forms a stable
+        prefix for provider-side prompt caching. Anthropic models only cache
+        content blocks explicitly marked with ``cache_control``.
+        
+        Returns:
+            System message
+        """
+        if self.model.startswith("anthropic/"):
+            return SystemMessage(content=[{
+                "type": "text",
+                "text": self.system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }])
+        
+        return SystemMessage(content=self.system_prompt)
     
     @abstractmethod
     def _get_default_system_prompt(self) -> str:
@@ -167,7 +470,9 @@ class BaseAgent(ABC):
         input_tokens: int,
         output_tokens: int,
         duration: float,
-        cache_hit: bool = False
+        cache_hit: bool = False,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
     ):
         """
         Track token usage and costs.
@@ -177,12 +482,16 @@ class BaseAgent(ABC):
             output_tokens: Number of output tokens
             duration: Duration in seconds
             cache_hit: Whether response was from cache
+            cache_read_tokens: Input tokens read from the provider prompt cache
+            cache_write_tokens: Input tokens written to the provider prompt cache
         """
         # Calculate cost
         cost, pricing_details = await cost_calculator.calculate_cost(
             model=self.model,
             input_tokens=input_tokens,
-            output_tokens=output_tokens
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens
         )
         
         # Record metrics
@@ -206,6 +515,74 @@ class BaseAgent(ABC):
             metadata=pricing_details
         )
     
+    def _extract_usage(
+        self,
+        response: AIMessage,
+        estimated_input_tokens: int
+    ) -> Tuple[int, int, int, int]:
+        """
+        Extract token counts from an LLM response.
+        
+        Args:
+            response: LLM response
+            estimated_input_tokens: Fallback input token count
+            
+        Returns:
+            Tuple of (input, output, cache read, cache write) tokens
+        """
+        response_metadata = getattr(response, 'response_metadata', None)
+        usage = response_metadata.get('token_usage') if response_metadata else None
+        
+        if not usage:
+            # OpenRouter always reports usage, so only pay for a full
+            # encode of the completion when strict accounting is enabled
+            performance_logger.logger.warning(
+                "missing_token_usage",
+                agent=self.name,
+                model=self.model
+            )
+            output_tokens = 0
+            if settings.STRICT_TOKEN_ACCOUNTING:
+                output_tokens = self._count_tokens(response.content)
+            return estimated_input_tokens, output_tokens, 0, 0
+        
+        # Prompt cache usage (OpenAI / OpenRouter format)
+        prompt_details = usage.get('prompt_tokens_details') or {}
+        
+        return (
+            usage.get('prompt_tokens', estimated_input_tokens),
+            usage.get('completion_tokens', 0),
+            prompt_details.get('cached_tokens') or 0,
+            prompt_details.get('cache_write_tokens') or 0
+        )
+    
+    async def _track_response_usage(
+        self,
+        response: AIMessage,
+        estimated_input_tokens: int,
+        duration: float
+    ):
+        """
+        Track token usage and costs for an LLM response.
+        
+        Args:
+            response: LLM response
+            estimated_input_tokens: Fallback input token count
+            duration: Duration in seconds
+        """
+        input_tokens, output_tokens, cache_read_tokens, cache_write_tokens = (
+            self._extract_usage(response, estimated_input_tokens)
+        )
+        
+        await self._track_usage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            duration=duration,
+            cache_hit=cache_read_tokens > 0,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens
+        )
+    
     async def invoke(
         self,
         messages: Union[str, List[BaseMessage]],
@@ -227,15 +604,13 @@ class BaseAgent(ABC):
         if isinstance(messages, str):
             messages = [HumanMessage(content=messages)]
         
-        # Add system message if not present
-        if not any(isinstance(m, SystemMessage) for m in messages):
-            messages = [SystemMessage(content=self.system_prompt)] + messages
-        
-        # Estimate tokens
-        estimated_input_tokens = self._estimate_tokens(messages)
+        # Add system message if not present and estimate tokens
+        messages, estimated_input_tokens = self._prepare_messages(messages)
         
         # Track request
-        request_id = f"{self.name}_{uuid.uuid4().hex[:8]}"
+        request_id = f"{self.name}_{next(_request_counter):08x}"
+        
+        handler = self._acquire_callback_handler()
         
         async with metrics_collector.track_request(
             agent=self.name,
@@ -256,26 +631,19 @@ class BaseAgent(ABC):
                     # Streaming not implemented yet
                     raise NotImplementedError("Streaming not yet implemented")
                 else:
-                    response = await self.llm.ainvoke(messages)
+                    response = await self.llm.ainvoke(
+                        messages,
+                        config=self._llm_call_config(handler)
+                    )
                 
                 # Calculate actual tokens and duration
                 duration = time.time() - start_time
                 
-                # Extract token counts from response
-                if hasattr(response, 'response_metadata'):
-                    usage = response.response_metadata.get('token_usage', {})
-                    actual_input_tokens = usage.get('prompt_tokens', estimated_input_tokens)
-                    output_tokens = usage.get('completion_tokens', 0)
-                else:
-                    actual_input_tokens = estimated_input_tokens
-                    output_tokens = self._count_tokens(response.content)
-                
-                # Track usage
-                await self._track_usage(
-                    input_tokens=actual_input_tokens,
-                    output_tokens=output_tokens,
-                    duration=duration,
-                    cache_hit=False
+                # Track usage reported by the provider
+                await self._track_response_usage(
+                    response,
+                    estimated_input_tokens,
+                    duration
                 )
                 
                 return response
@@ -294,20 +662,29 @@ class BaseAgent(ABC):
             finally:
                 # Release rate limit
                 await self._release_rate_limit()
+                self._release_callback_handler(handler)
     
     async def invoke_with_tools(
         self,
         messages: Union[str, List[BaseMessage]],
         tools: Optional[List[Tool]] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        execute_tools: bool = False
     ) -> Tuple[AIMessage, List[Dict[str, Any]]]:
         """
         Invoke the agent with tool support.
         
+        With execute_tools, every tool call the model emits in its turn is run
+        (concurrently, see execute_tool_calls) and the results are sent back in
+        a single observation round, so the answer takes two model calls no
+        matter how many tools were needed.
+        
         Args:
             messages: Input messages
             tools: Tools to use (defaults to agent's tools)
             context: Optional context
+            execute_tools: Run the requested tools and return the model's
+                answer to their results
             
         Returns:
             Tuple of (response, tool_calls)
@@ -321,18 +698,14 @@ class BaseAgent(ABC):
             return response, []
         
         # Bind tools to LLM
-        llm_with_tools = self.llm.bind_tools(tools_to_use)
+        llm_with_tools = self._get_llm_with_tools(tools_to_use)
         
         # Convert string to messages if needed
         if isinstance(messages, str):
             messages = [HumanMessage(content=messages)]
         
-        # Add system message
-        if not any(isinstance(m, SystemMessage) for m in messages):
-            messages = [SystemMessage(content=self.system_prompt)] + messages
-        
-        # Estimate tokens
-        estimated_tokens = self._estimate_tokens(messages)
+        # Add system message and estimate tokens
+        messages, estimated_tokens = self._prepare_messages(messages)
         
         async with performance_logger.log_operation(
             operation_type="agent_with_tools",
@@ -346,21 +719,148 @@ class BaseAgent(ABC):
                     raise Exception("Rate limit exceeded")
                 
                 # Invoke with tools
-                response = await llm_with_tools.ainvoke(messages)
+                handler = self._acquire_callback_handler()
+                try:
+                    response = await llm_with_tools.ainvoke(
+                        messages,
+                        config=self._llm_call_config(handler)
+                    )
+                finally:
+                    self._release_callback_handler(handler)
                 
                 # Extract tool calls
-                tool_calls = []
-                if hasattr(response, 'tool_calls'):
-                    tool_calls = response.tool_calls
+                tool_calls = getattr(response, 'tool_calls', None) or []
                 
                 # Update metrics
                 metrics.metadata["tool_calls_count"] = len(tool_calls)
                 metrics.metadata["tools_available"] = len(tools_to_use)
                 
-                return response, tool_calls
-                
             finally:
                 await self._release_rate_limit()
+        
+        if execute_tools and tool_calls:
+            tool_messages = await self.execute_tool_calls(tool_calls, tools)
+            response, _ = await self.invoke_with_tools(
+                [*messages, response, *tool_messages],
+                tools=tools,
+                context=context
+            )
+        
+        return response, tool_calls
+    
+    def _get_llm_with_tools(self, tools: List[Tool]) -> Any:
+        """
+        Get the LLM with tools bound, reusing a previous binding if possible.
+        
+        Args:
+            tools: Tools to bind
+            
+        Returns:
+            LLM runnable with tools bound
+        """
+        key = frozenset(tool.name for tool in tools)
+        llm_with_tools = self._bound_llm_cache.get(key)
+        if llm_with_tools is None:
+            llm_with_tools = self.llm.bind_tools(tools)
+            self._bound_llm_cache[key] = llm_with_tools
+        return llm_with_tools
+    
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """
+        Get the text of an LLM response.
+        
+        Args:
+            response: LLM response (message or raw value)
+            
+        Returns:
+            Message content, or the stringified response if it has none
+        """
+        content = getattr(response, "content", None)
+        return content if content is not None else str(response)
+    
+    @property
+    def tools(self) -> List[Tool]:
+        """Tools available to the agent."""
+        return self._tools
+    
+    @tools.setter
+    def tools(self, tools: Optional[List[Tool]]):
+        """Set the agent's tools and rebuild the name index."""
+        self._tools = tools or []
+        self._tools_by_name: Dict[str, Tool] = {tool.name: tool for tool in self._tools}
+    
+    def get_tool(self, name: str) -> Optional[Tool]:
+        """
+        Get one of the agent's tools by name.
+        
+        Args:
+            name: Tool name
+            
+        Returns:
+            The tool, or None if the agent doesn't have it
+        """
+        return self._tools_by_name.get(name)
+    
+    async def execute_tool_calls(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        tools: Optional[List[Tool]] = None
+    ) -> List[ToolMessage]:
+        """
+        Execute tool calls requested by the model.
+        
+        Calls run concurrently when parallel_tools is set, otherwise in order.
+        A failing or unknown tool yields an error message for that call
+        rather than failing the others.
+        
+        Args:
+            tool_calls: Tool calls from a model response
+            tools: Tools to use (defaults to agent's tools)
+            
+        Returns:
+            One tool message per call, in call order
+        """
+        tools_by_name = (
+            {tool.name: tool for tool in tools} if tools else self._tools_by_name
+        )
+        
+        async def run(tool_call: Dict[str, Any]) -> ToolMessage:
+            tool = tools_by_name.get(tool_call["name"])
+            if tool is None:
+                return ToolMessage(
+                    content=f"Unknown tool: {tool_call['name']}",
+                    tool_call_id=tool_call["id"],
+                    status="error"
+                )
+            
+            try:
+                result = await tool.ainvoke(tool_call["args"])
+            except Exception as e:
+                performance_logger.logger.error(
+                    "tool_call_failed",
+                    agent=self.name,
+                    tool_name=tool_call["name"],
+                    error=str(e)
+                )
+                return ToolMessage(
+                    content=f"Tool {tool_call['name']} failed: {e}",
+                    tool_call_id=tool_call["id"],
+                    status="error"
+                )
+            
+            return ToolMessage(
+                content=result if isinstance(result, str) else dumps_json(result),
+                tool_call_id=tool_call["id"]
+            )
+        
+        if self.parallel_tools:
+            return list(await asyncio.gather(*(run(call) for call in tool_calls)))
+        return [await run(call) for call in tool_calls]
+    
+    def clear_tool_cache(self):
+        """Drop cached tool bindings (call after changing tool definitions)."""
+        self._bound_llm_cache.clear()
     
     def create_prompt(
         self,
@@ -390,7 +890,9 @@ class BaseAgent(ABC):
     async def batch_invoke(
         self,
         message_batches: List[List[BaseMessage]],
-        max_concurrency: int = 5
+        max_concurrency: int = 5,
+        use_batch_api: bool = False,
+        poll_interval: float = 5.0
     ) -> List[Union[AIMessage, Exception]]:
         """
         Invoke the agent with multiple message batches.
@@ -398,33 +900,21 @@ class BaseAgent(ABC):
         Args:
             message_batches: List of message batches
             max_concurrency: Maximum concurrent requests
+            use_batch_api: Submit through the OpenAI Batch API (discounted,
+                but may take up to 24h; only for latency-tolerant jobs)
+            poll_interval: Seconds between batch status checks
             
         Returns:
             List of responses or exceptions
         """
-        import asyncio
-        
-        async def invoke_single(messages):
-            try:
-                return await self.invoke(messages)
-            except Exception as e:
-                return e
-        
-        # Create semaphore for concurrency control
-        semaphore = asyncio.Semaphore(max_concurrency)
-        
-        async def invoke_with_semaphore(messages):
-            async with semaphore:
-                return await invoke_single(messages)
-        
         # Track batch operation
         start_time = time.time()
         
         # Execute all invocations
-        results = await asyncio.gather(
-            *[invoke_with_semaphore(messages) for messages in message_batches],
-            return_exceptions=True
-        )
+        if use_batch_api:
+            results = await self._invoke_via_batch_api(message_batches, poll_interval)
+        else:
+            results = await self._invoke_via_abatch(message_batches, max_concurrency)
         
         # Log batch performance
         duration = time.time() - start_time
@@ -439,8 +929,224 @@ class BaseAgent(ABC):
             duration_ms=duration * 1000,
             metadata={
                 "max_concurrency": max_concurrency,
-                "model": self.model
+                "model": self.model,
+                "batch_api": use_batch_api
             }
         )
         
-        return results
\ No newline at end of file
+        return results
+    
+    async def _invoke_via_abatch(
+        self,
+        message_batches: List[List[BaseMessage]],
+        max_concurrency: int
+    ) -> List[Union[AIMessage, Exception]]:
+        """
+        Run message batches through the LLM's native batch interface.
+        
+        Args:
+            message_batches: List of message batches
+            max_concurrency: Maximum concurrent requests
+            
+        Returns:
+            List of responses or exceptions, in input order
+        """
+        if not message_batches:
+            return []
+        
+        prepared = [self._prepare_messages(messages) for messages in message_batches]
+        
+        # Each item is rate limited and tracked as its own request; the items
+        # that get capacity then share one abatch call
+        loop = asyncio.get_running_loop()
+        admitted = [loop.create_future() for _ in prepared]
+        outputs = [loop.create_future() for _ in prepared]
+        
+        async def run_item(index: int) -> AIMessage:
+            _, tokens = prepared[index]
+            request_id = f"{self.name}_{next(_request_counter):08x}"
+            
+            async with metrics_collector.track_request(
+                agent=self.name,
+                model=self.model,
+                request_id=request_id
+            ):
+                acquired = False
+                try:
+                    acquired = await self._acquire_rate_limit(tokens)
+                finally:
+                    admitted[index].set_result(acquired)
+                if not acquired:
+                    raise Exception("Rate limit exceeded")
+                
+                try:
+                    result, duration = await outputs[index]
+                finally:
+                    await self._release_rate_limit()
+                
+                if isinstance(result, Exception):
+                    raise result
+                
+                await self._track_response_usage(result, tokens, duration)
+                return result
+        
+        async def run_batch():
+            runnable: List[int] = []
+            try:
+                flags = await asyncio.gather(*admitted)
+                runnable = [i for i, ok in enumerate(flags) if ok]
+                if not runnable:
+                    return
+                
+                start_time = time.time()
+                
+                # One handler per item, since items run concurrently
+                handlers = [self._acquire_callback_handler() for _ in runnable]
+                try:
+                    results = await self.llm.abatch(
+                        [prepared[i][0] for i in runnable],
+                        config=[
+                            self._llm_call_config(handler, max_concurrency=max_concurrency)
+                            for handler in handlers
+                        ],
+                        return_exceptions=True
+                    )
+                finally:
+                    self._handler_pool.extend(handlers)
+                
+                duration = time.time() - start_time
+                for i, result in zip(runnable, results, strict=True):
+                    outputs[i].set_result((result, duration))
+                    
+            except BaseException as e:
+                performance_logger.logger.error(
+                    "agent_batch_invocation_failed",
+                    agent=self.name,
+                    model=self.model,
+                    error=str(e),
+                    error_type=type(e).__name__
+                )
+                # Never leave an item waiting
+                for i in runnable:
+                    if not outputs[i].done():
+                        outputs[i].set_result((e, 0.0))
+                raise
+        
+        batch_task = asyncio.ensure_future(run_batch())
+        try:
+            results = await asyncio.gather(
+                *[run_item(i) for i in range(len(prepared))],
+                return_exceptions=True
+            )
+            await batch_task
+        finally:
+            batch_task.cancel()
+        
+        return results
+    
+    async def _invoke_via_batch_api(
+        self,
+        message_batches: List[List[BaseMessage]],
+        poll_interval: float
+    ) -> List[Union[AIMessage, Exception]]:
+        """
+        Run message batches through the OpenAI Batch API.
+        
+        Args:
+            message_batches: List of message batches
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            List of responses or exceptions, in input order
+        """
+        # The Batch API is only offered by OpenAI itself, not OpenRouter
+        if not self.model.startswith("openai/"):
+            raise ValueError(f"Batch API is not supported for model: {self.model}")
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is required for the Batch API")
+        
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        model = self.model.split("/", 1)[1]
+        
+        # Serialize one chat completion request per line
+        lines = []
+        estimated_tokens = []
+        for i, messages in enumerate(message_batches):
+            prepared, tokens = self._prepare_messages(messages)
+            estimated_tokens.append(tokens)
+            body: Dict[str, Any] = {
+                "model": model,
+                "messages": convert_to_openai_messages(prepared),
+                "temperature": self.temperature
+            }
+            if self.max_tokens:
+                body["max_tokens"] = self.max_tokens
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+        
+        start_time = time.time()
+        
+        try:
+            input_file = await client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode()),
+                purpose="batch"
+            )
+            batch = await client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+            # Poll until the batch reaches a terminal state
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(poll_interval)
+                batch = await client.batches.retrieve(batch.id)
+            
+            if batch.status != "completed":
+                raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+            
+            results: List[Union[AIMessage, Exception]] = [
+                RuntimeError("No result returned for request")
+                for _ in message_batches
+            ]
+            
+            # Map output lines back to input positions
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                content = await client.files.content(file_id)
+                for line in content.text.splitlines():
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    index = int(item["custom_id"])
+                    response = item.get("response") or {}
+                    if item.get("error") or response.get("status_code") != 200:
+                        results[index] = RuntimeError(
+                            str(item.get("error") or response.get("body"))
+                        )
+                        continue
+                    body = response["body"]
+                    results[index] = AIMessage(
+                        content=body["choices"][0]["message"].get("content") or "",
+                        response_metadata={
+                            "token_usage": body.get("usage", {}),
+                            "model_name": body.get("model"),
+                            "batch_id": batch.id
+                        }
+                    )
+            
+            # Record spend for each completed request
+            duration = time.time() - start_time
+            for result, tokens in zip(results, estimated_tokens, strict=True):
+                if not isinstance(result, Exception):
+                    await self._track_response_usage(result, tokens, duration)
+            
+            return results
+            
+        finally:
+            await client.close()
\ No newline at end of file
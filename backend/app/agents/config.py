@@ -1,7 +1,8 @@
 """Agent configuration system with model mapping."""
 
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, FrozenSet
+from dataclasses import dataclass, field, replace
+from collections import Counter, defaultdict
 from enum import Enum
 
 from app.core.config import settings
@@ -16,9 +17,9 @@ class AgentType(str, Enum):
     GENERAL = "general"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AgentConfig:
-    """Configuration for an individual agent."""
+    """Configuration for an individual agent (immutable; see update_config)."""
     name: str
     agent_type: AgentType
     model: str
@@ -32,9 +33,23 @@ class AgentConfig:
     enable_streaming: bool = True
     cache_ttl_seconds: int = 300
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _dict_cache: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
+        """
+        Convert to dictionary.
+        
+        The config is immutable, so the dictionary is built once; each call
+        returns a shallow copy so callers can't change the cached one.
+        """
+        if self._dict_cache is None:
+            object.__setattr__(self, "_dict_cache", self._build_dict())
+        return dict(self._dict_cache)
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the dictionary representation."""
         return {
             "name": self.name,
             "agent_type": self.agent_type.value,
@@ -58,7 +73,31 @@ class AgentConfigManager:
     def __init__(self):
         """Initialize the configuration manager."""
         self._configs: Dict[AgentType, AgentConfig] = {}
+        self._export_cache: Optional[Dict[str, Any]] = None
         self._initialize_default_configs()
+        self._build_routing_index()
+    
+    def _build_routing_index(self):
+        """Precompute normalized routing keywords for routable agents."""
+        # Orchestrator handles all queries, so it's never a routing target
+        self._routable: List[AgentType] = [
+            agent_type for agent_type in self._configs
+            if agent_type != AgentType.ORCHESTRATOR
+        ]
+        
+        self._keyword_sets: Dict[AgentType, FrozenSet[str]] = {
+            agent_type: frozenset(
+                word.lower() for word in config.routing_keywords
+            )
+            for agent_type, config in self._configs.items()
+        }
+        
+        # Inverted index from keyword to the agents that route on it
+        keyword_index: Dict[str, List[AgentType]] = defaultdict(list)
+        for agent_type in self._routable:
+            for keyword in self._keyword_sets[agent_type]:
+                keyword_index[keyword].append(agent_type)
+        self._keyword_index: Dict[str, List[AgentType]] = dict(keyword_index)
     
     def _initialize_default_configs(self):
         """Initialize default agent configurations."""
@@ -270,6 +309,21 @@ Always prioritize user understanding and safety in DeFi.""",
         
         return self._configs[agent_type]
     
+    def get_routing_keywords(self, agent_type: AgentType) -> FrozenSet[str]:
+        """
+        Get the lowercased routing keywords for an agent type.
+        
+        Args:
+            agent_type: Type of agent
+            
+        Returns:
+            Normalized routing keywords
+        """
+        if agent_type not in self._keyword_sets:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+        
+        return self._keyword_sets[agent_type]
+    
     def update_config(
         self,
         agent_type: AgentType,
@@ -278,6 +332,9 @@ Always prioritize user understanding and safety in DeFi.""",
         """
         Update configuration for an agent.
         
+        Configs are immutable, so this stores a new config object. Agents
+        created before the update keep the config they were built with.
+        
         Args:
             agent_type: Type of agent
             updates: Dictionary of updates
@@ -288,17 +345,21 @@ Always prioritize user understanding and safety in DeFi.""",
         if agent_type not in self._configs:
             raise ValueError(f"Unknown agent type: {agent_type}")
         
-        config = self._configs[agent_type]
-        
-        # Update allowed fields
+        # Update allowed fields (routing_keywords is not updatable, so the
+        # routing index never needs rebuilding here)
         allowed_fields = {
             "model", "temperature", "max_tokens", "system_prompt",
             "fallback_model", "enable_streaming", "cache_ttl_seconds"
         }
         
-        for key, value in updates.items():
-            if key in allowed_fields and hasattr(config, key):
-                setattr(config, key, value)
+        allowed_updates = {
+            key: value for key, value in updates.items()
+            if key in allowed_fields
+        }
+        
+        config = replace(self._configs[agent_type], **allowed_updates)
+        self._configs[agent_type] = config
+        self._export_cache = None
         
         return config
     
@@ -342,30 +403,25 @@ Always prioritize user understanding and safety in DeFi.""",
         Returns:
             Best matching agent type or None
         """
-        keyword_set = set(word.lower() for word in keywords)
-        best_match = None
-        best_score = 0
+        # Count matching keywords per agent in a single pass over the query
+        scores: Counter = Counter()
+        for word in frozenset(map(str.lower, keywords)):
+            scores.update(self._keyword_index.get(word, ()))
         
-        for agent_type, config in self._configs.items():
-            if agent_type == AgentType.ORCHESTRATOR:
-                continue  # Skip orchestrator
-            
-            # Count matching keywords
-            agent_keywords = set(word.lower() for word in config.routing_keywords)
-            matches = len(keyword_set.intersection(agent_keywords))
-            
-            if matches > best_score:
-                best_score = matches
-                best_match = agent_type
+        if not scores:
+            return None
         
-        return best_match
+        # Ties go to the agent defined first, as before
+        return max(self._routable, key=lambda agent_type: scores[agent_type])
     
     def export_configs(self) -> Dict[str, Any]:
-        """Export all configurations as dictionary."""
-        return {
-            agent_type.value: config.to_dict()
-            for agent_type, config in self._configs.items()
-        }
+        """Export all configurations as dictionary (shared, read-only)."""
+        if self._export_cache is None:
+            self._export_cache = {
+                agent_type.value: config.to_dict()
+                for agent_type, config in self._configs.items()
+            }
+        return self._export_cache
 
 
 # Global configuration manager instance
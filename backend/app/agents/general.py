@@ -1,15 +1,37 @@
 """General Q&A agent for DeFi queries."""
 
-import json
-from typing import Dict, Any, Optional, List
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Hashable
 from datetime import datetime
 from langchain_core.tools import Tool
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, dumps_json
 from app.agents.config import AgentType, agent_config_manager
+from app.services.metrics import metrics_collector
 from app.services.performance_logger import performance_logger
 
 
+# Connective words in topic descriptions that say nothing about the topic
+_TOPIC_STOPWORDS = frozenset({"by", "for", "from", "in", "vs"})
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _build_topic_index(topics: Dict[str, str]) -> Dict[str, str]:
+    """Map single-word topic names and description words to their (first) topic."""
+    index: Dict[str, str] = {}
+    for topic, description in topics.items():
+        if "_" not in topic:
+            index.setdefault(topic, topic)
+        for word in _WORD_RE.findall(description.lower()):
+            if word not in _TOPIC_STOPWORDS:
+                index.setdefault(word, topic)
+    return index
+
+
 class GeneralAgent(BaseAgent):
     """Agent for general DeFi questions and educational content."""
     
@@ -27,6 +49,17 @@ class GeneralAgent(BaseAgent):
         "governance": "Protocol decision making"
     }
     
+    # Educational answers cached by prompt. Their prompts are built purely
+    # from the arguments, so repeats can skip the LLM round-trip.
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 3600  # seconds
+    
+    # Keyword -> topic index and multi-word topic names, built once
+    _TOPIC_INDEX = _build_topic_index(DEFI_TOPICS)
+    _TOPIC_PHRASES = [
+        (topic.replace("_", " "), topic) for topic in DEFI_TOPICS if "_" in topic
+    ]
+    
     def __init__(self, tools: Optional[List[Tool]] = None):
         """
         Initialize the general agent.
@@ -35,6 +68,10 @@ class GeneralAgent(BaseAgent):
             tools: Optional list of tools
         """
         config = agent_config_manager.get_config(AgentType.GENERAL)
+        
+        # Set before BaseAgent.__init__, which falls back to it
+        self._default_system_prompt = config.system_prompt
+        
         super().__init__(
             name=config.name,
             model=config.model,
@@ -44,10 +81,13 @@ class GeneralAgent(BaseAgent):
             tools=tools
         )
         self.config = config
+        
+        # Recent educational answers: prompt -> (cached at, answer)
+        self._response_cache: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
     
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt."""
-        return self.config.system_prompt
+        return self._default_system_prompt
     
     async def answer_question(
         self,
@@ -93,7 +133,7 @@ class GeneralAgent(BaseAgent):
                 topic = self._detect_topic(query)
                 metrics.metadata["topic"] = topic
                 
-                return response.content if hasattr(response, 'content') else str(response)
+                return self._response_text(response)
                 
             except Exception as e:
                 performance_logger.logger.error(
@@ -110,6 +150,25 @@ class GeneralAgent(BaseAgent):
         education_level: str
     ) -> str:
         """Enhance query with educational context."""
+        # Reduce context to hashable values so the prompt can be memoized
+        has_holdings = bool(context) and "user_holdings" in context
+        previous_topics = None
+        if context and "previous_topics" in context:
+            previous_topics = tuple(context["previous_topics"][:3])
+        
+        return self._enhance_query_cached(
+            query, education_level, has_holdings, previous_topics
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _enhance_query_cached(
+        query: str,
+        education_level: str,
+        has_holdings: bool,
+        previous_topics: Optional[Tuple[str, ...]]
+    ) -> str:
+        """Build the enhanced query from hashable inputs."""
         parts = [query]
         
         # Add education level guidance
@@ -122,26 +181,78 @@ class GeneralAgent(BaseAgent):
         parts.append(f"\nEducation Level: {education_level}")
         parts.append(f"Approach: {level_guidance.get(education_level, level_guidance['intermediate'])}")
         
-        if context:
-            if "user_holdings" in context:
-                parts.append("\nUser has DeFi experience (holds tokens)")
-            if "previous_topics" in context:
-                parts.append(f"Previously discussed: {', '.join(context['previous_topics'][:3])}")
+        if has_holdings:
+            parts.append("\nUser has DeFi experience (holds tokens)")
+        if previous_topics is not None:
+            parts.append(f"Previously discussed: {', '.join(previous_topics)}")
         
         return "\n".join(parts)
     
     def _detect_topic(self, query: str) -> str:
         """Detect the main topic of the query."""
-        query_lower = query.lower()
+        return self._detect_topic_cached(query.lower())
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _detect_topic_cached(query_lower: str) -> str:
+        """Detect the topic of a lowercased query."""
+        # Multi-word topic names first, then one lookup per query word
+        for phrase, topic in GeneralAgent._TOPIC_PHRASES:
+            if phrase in query_lower:
+                return topic
         
-        for topic, keywords in self.DEFI_TOPICS.items():
-            if topic.replace("_", " ") in query_lower or any(
-                word in query_lower for word in keywords.lower().split()
-            ):
+        for word in _WORD_RE.findall(query_lower):
+            topic = GeneralAgent._TOPIC_INDEX.get(word)
+            if topic:
                 return topic
         
         return "general_defi"
     
+    async def _invoke_cached(
+        self,
+        prompt: str,
+        query_type: str,
+        cache_key: Optional[Hashable] = None
+    ) -> str:
+        """
+        Invoke the LLM, reusing a recent answer to the same prompt.
+        
+        Cache hits never reach invoke, so they use no rate limit capacity
+        and incur no cost.
+        
+        Args:
+            prompt: Prompt built purely from the caller's arguments
+            query_type: Query type for cache metrics
+            cache_key: Key for requests that are equivalent despite
+                differently worded prompts (defaults to the prompt)
+            
+        Returns:
+            Response text
+        """
+        if cache_key is None:
+            cache_key = prompt
+        
+        entry = self._response_cache.get(cache_key)
+        hit = entry is not None and time.monotonic() - entry[0] < self.RESPONSE_CACHE_TTL
+        await metrics_collector.record_cache_access(
+            agent=self.name,
+            query_type=query_type,
+            hit=hit
+        )
+        if hit:
+            self._response_cache.move_to_end(cache_key)
+            return entry[1]
+        
+        response = await self.invoke(prompt)
+        answer = self._response_text(response)
+        
+        self._response_cache[cache_key] = (time.monotonic(), answer)
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        
+        return answer
+    
     async def explain_concept(
         self,
         concept: str,
@@ -174,8 +285,7 @@ Structure your explanation:
 
 Make it educational and accessible."""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return await self._invoke_cached(prompt, "explain_concept")
     
     async def provide_tutorial(
         self,
@@ -209,8 +319,7 @@ Include:
 
 Make it practical and actionable."""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return await self._invoke_cached(prompt, "provide_tutorial")
     
     async def analyze_protocol(
         self,
@@ -245,8 +354,11 @@ Provide objective analysis including:
 
 Be balanced and factual."""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        # Aspects are listed in the caller's order, but equivalent requests
+        # share a cache entry
+        cache_key = ("analyze_protocol", protocol_name, frozenset(aspects))
+        
+        return await self._invoke_cached(prompt, "analyze_protocol", cache_key)
     
     async def compare_protocols(
         self,
@@ -285,8 +397,13 @@ Provide a balanced comparison:
 4. Best use cases for each
 5. Recommendation based on user needs"""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        # Criteria are listed in the caller's order, but equivalent requests
+        # share a cache entry
+        cache_key = (
+            "compare_protocols", protocol1, protocol2, frozenset(comparison_criteria)
+        )
+        
+        return await self._invoke_cached(prompt, "compare_protocols", cache_key)
     
     async def explain_transaction(
         self,
@@ -305,7 +422,7 @@ Provide a balanced comparison:
         """
         prompt = f"""Explain this DeFi transaction type: {tx_type}
 
-{f"Details: {json.dumps(details, indent=2)}" if details else ""}
+{f"Details: {dumps_json(details)}" if details else ""}
 
 Explain:
 1. What this transaction does
@@ -316,8 +433,7 @@ Explain:
 
 Use clear, non-technical language where possible."""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return await self._invoke_cached(prompt, "explain_transaction")
     
     async def safety_check(
         self,
@@ -336,7 +452,7 @@ Use clear, non-technical language where possible."""
         """
         prompt = f"""Provide safety guidance for: {action}
 
-{f"Context: {json.dumps(context, indent=2)}" if context else ""}
+{f"Context: {dumps_json(context)}" if context else ""}
 
 Cover:
 1. Main risks involved
@@ -347,8 +463,7 @@ Cover:
 
 Prioritize user safety and asset protection."""
         
-        response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return await self._invoke_cached(prompt, "safety_check")
     
     async def market_insight(
         self,
@@ -379,5 +494,6 @@ Include:
 Note: Avoid price predictions or financial advice.
 Focus on educational market understanding."""
         
+        # Market insights are time-sensitive, so never cached
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
\ No newline at end of file
+        return self._response_text(response)
\ No newline at end of file
@@ -1,21 +1,82 @@
 """Orchestrator agent for query routing."""
 
+import asyncio
+import copy
+import hashlib
 import json
-from typing import Dict, Any, Optional, List, Tuple
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 import re
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, dumps_json
 from app.agents.config import AgentType, agent_config_manager
 from app.services.performance_logger import performance_logger
 
 
+# Decoder for JSON embedded in LLM responses
+_JSON_DECODER = json.JSONDecoder()
+
+# Word tokenizer for keyword routing
+_WORD_RE = re.compile(r'\w+')
+
+# Parameter extraction patterns (compiled once; run on every routed query)
+_WALLET_RE = re.compile(r'0x[a-fA-F0-9]{40}')
+_TOKEN_RE = re.compile(r'\b[A-Z]{2,10}\b')
+_AMOUNT_RE = re.compile(
+    r'\b(\d+(?:\.\d+)?)\s*(?:tokens?|eth|bnb|matic|usd[tc]?)\b',
+    re.IGNORECASE
+)
+_SWAP_RE = re.compile(
+    r'(?:swap|exchange|convert)\s+(\d*\.?\d*\s*)?(\w+)\s+(?:to|for)\s+(\w+)',
+    re.IGNORECASE
+)
+
+# Agents a query can be routed to (the orchestrator itself never is)
+_ROUTABLE_AGENTS: Tuple[AgentType, ...] = tuple(
+    agent_type for agent_type in AgentType
+    if agent_type != AgentType.ORCHESTRATOR
+)
+_VALID_AGENT_VALUES = frozenset(agent_type.value for agent_type in _ROUTABLE_AGENTS)
+
+
 class OrchestratorAgent(BaseAgent):
     """Agent responsible for routing queries to appropriate specialized agents."""
     
+    # Routing decision cache bounds
+    ROUTE_CACHE_SIZE = 1024
+    ROUTE_CACHE_TTL = 300  # seconds
+    
+    # Static parts of the routing prompt. The instructions come first so every
+    # routing request shares an identical prefix for provider prompt caching.
+    _ROUTING_PROMPT_PREFIX = """Analyze this user query and determine which specialized agent should handle it.
+
+Available Agents:
+1. portfolio - Portfolio analysis, balance checks, holdings overview
+2. rebalancing - Portfolio optimization and rebalancing suggestions
+3. swap - Token swaps, quotes, and exchange operations
+4. general - General DeFi questions, education, and other queries
+
+"""
+    
+    _ROUTING_PROMPT_SUFFIX = """
+
+Respond with ONLY a JSON object in this exact format:
+{
+    "selected_agent": "agent_name",
+    "confidence": 0.8,
+    "reasoning": "Brief explanation",
+    "extracted_params": {}
+}"""
+    
     def __init__(self):
         """Initialize the orchestrator agent."""
         config = agent_config_manager.get_config(AgentType.ORCHESTRATOR)
+        
+        # Set before BaseAgent.__init__, which falls back to it
+        self._default_system_prompt = config.system_prompt
+        
         super().__init__(
             name=config.name,
             model=config.model,
@@ -27,36 +88,69 @@ class OrchestratorAgent(BaseAgent):
         
         # Compile routing patterns
         self._compile_routing_patterns()
+        
+        # Recent routing decisions: key -> (cached at, decision)
+        self._route_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
     
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt."""
-        return self.config.system_prompt
+        return self._default_system_prompt
     
     def _compile_routing_patterns(self):
-        """Compile regex patterns for quick routing."""
-        self.routing_patterns = {
-            AgentType.PORTFOLIO: re.compile(
-                r'\b(portfolio|balance|holdings?|assets?|tokens?|worth|value|positions?|wallet)\b',
-                re.IGNORECASE
-            ),
-            AgentType.REBALANCING: re.compile(
-                r'\b(rebalanc|optimiz|allocat|diversif|redistribut|adjust|strateg|risk)\b',
-                re.IGNORECASE
-            ),
-            AgentType.SWAP: re.compile(
-                r'\b(swap|exchange|trade|convert|sell|buy|quote|price|route|slippage)\b',
-                re.IGNORECASE
-            ),
-            AgentType.GENERAL: re.compile(
-                r'\b(what|how|why|explain|help|defi|protocol|yield|liquidity|gas)\b',
-                re.IGNORECASE
-            )
+        """Compile the keyword lookup table for quick routing."""
+        # Routing keywords match whole words; stems are expanded to their
+        # common word forms
+        routing_keywords = {
+            AgentType.PORTFOLIO: [
+                "portfolio", "balance", "holding", "holdings", "asset", "assets",
+                "token", "tokens", "worth", "value", "position", "positions", "wallet"
+            ],
+            AgentType.REBALANCING: [
+                "rebalance", "rebalanced", "rebalances", "rebalancing",
+                "optimize", "optimized", "optimizes", "optimizing", "optimization",
+                "allocate", "allocated", "allocating", "allocation", "allocations",
+                "diversify", "diversified", "diversifying", "diversification",
+                "redistribute", "redistributed", "redistributing", "redistribution",
+                "adjust", "adjusted", "adjusting", "adjustment", "adjustments",
+                "strategy", "strategies", "strategic", "risk", "risks"
+            ],
+            AgentType.SWAP: [
+                "swap", "exchange", "trade", "convert", "sell", "buy",
+                "quote", "price", "route", "slippage"
+            ],
+            AgentType.GENERAL: [
+                "what", "how", "why", "explain", "help", "defi",
+                "protocol", "yield", "liquidity", "gas"
+            ]
+        }
+        
+        # Word -> agent table; routing tokenizes the query once and does one
+        # hash lookup per word instead of running regex alternations
+        self._routing_lookup: Dict[str, AgentType] = {
+            word: agent_type
+            for agent_type, words in routing_keywords.items()
+            for word in words
         }
+        self._routing_order: List[AgentType] = list(routing_keywords)
+        
+        # Substring matchers over each agent's configured routing keywords,
+        # used to score options; one C-level search per query word replaces
+        # a Python-level scan of every keyword
+        self._option_matchers: List[Tuple[AgentType, "re.Pattern[str]"]] = []
+        for agent_type in _ROUTABLE_AGENTS:
+            keywords = sorted(agent_config_manager.get_routing_keywords(agent_type))
+            if keywords:
+                matcher = re.compile('|'.join(map(re.escape, keywords)))
+            else:
+                matcher = re.compile(r'(?!)')  # Never matches
+            self._option_matchers.append((agent_type, matcher))
     
     async def route_query(
         self,
         query: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        speculate: Optional[Callable[[], Awaitable[Any]]] = None
     ) -> Dict[str, Any]:
         """
         Route a query to the appropriate agent.
@@ -64,6 +158,10 @@ class OrchestratorAgent(BaseAgent):
         Args:
             query: User query
             context: Optional context
+            speculate: Optional factory for the general agent's answer. When
+                patterns lean towards the general agent but LLM routing is
+                still needed, it runs concurrently with routing and its
+                result is returned as "speculative_response" if confirmed.
             
         Returns:
             Routing decision with agent selection and metadata
@@ -76,6 +174,14 @@ class OrchestratorAgent(BaseAgent):
             query_length=len(query)
         ) as metrics:
             try:
+                # Repeated queries reuse the earlier decision
+                cache_key = self._route_cache_key(query, context)
+                cached = self._get_cached_route(cache_key)
+                if cached is not None:
+                    metrics.metadata["routing_method"] = "cache"
+                    metrics.metadata["selected_agent"] = cached["selected_agent"]
+                    return cached
+                
                 # First try pattern-based routing for speed
                 pattern_match = self._pattern_based_routing(query)
                 
@@ -91,10 +197,30 @@ class OrchestratorAgent(BaseAgent):
                         routing_time_ms=metrics.duration_ms or 0
                     )
                     
+                    self._cache_route(cache_key, pattern_match)
                     return pattern_match
                 
+                # Likely a general question: start answering it while the
+                # LLM routes instead of waiting for two sequential round-trips
+                speculative_task = None
+                if (
+                    speculate is not None
+                    and pattern_match
+                    and pattern_match["selected_agent"] == AgentType.GENERAL.value
+                    and pattern_match["confidence"] >= 0.5
+                ):
+                    speculative_task = asyncio.create_task(speculate())
+                
                 # Use LLM for complex routing
-                llm_result = await self._llm_based_routing(query, context)
+                try:
+                    llm_result = await self._llm_based_routing(query, context)
+                    
+                    if speculative_task is not None:
+                        await self._resolve_speculation(speculative_task, llm_result, metrics)
+                finally:
+                    # Never leave the speculative answer running unobserved
+                    if speculative_task is not None and not speculative_task.done():
+                        speculative_task.cancel()
                 
                 metrics.metadata["routing_method"] = "llm"
                 metrics.metadata["selected_agent"] = llm_result["selected_agent"]
@@ -107,6 +233,7 @@ class OrchestratorAgent(BaseAgent):
                     alternatives=llm_result.get("alternatives", [])
                 )
                 
+                self._cache_route(cache_key, llm_result)
                 return llm_result
                 
             except Exception as e:
@@ -125,6 +252,75 @@ class OrchestratorAgent(BaseAgent):
                     "error": str(e)
                 }
     
+    def _route_cache_key(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]]
+    ) -> str:
+        """Build the routing cache key from the normalized query and context."""
+        payload = (
+            query.strip().lower().encode()
+            + json.dumps(context or {}, sort_keys=True, default=str).encode()
+        )
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _get_cached_route(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached routing decision if still fresh."""
+        entry = self._route_cache.get(key)
+        if entry is None:
+            return None
+        
+        cached_at, decision = entry
+        if time.monotonic() - cached_at >= self.ROUTE_CACHE_TTL:
+            del self._route_cache[key]
+            return None
+        
+        self._route_cache.move_to_end(key)
+        return copy.deepcopy(decision)
+    
+    def _cache_route(self, key: str, decision: Dict[str, Any]):
+        """Cache a routing decision (failed decisions are not cached)."""
+        if "error" in decision:
+            return
+        
+        # Speculative answers belong to the request that produced them
+        decision = {k: v for k, v in decision.items() if k != "speculative_response"}
+        self._route_cache[key] = (time.monotonic(), copy.deepcopy(decision))
+        self._route_cache.move_to_end(key)
+        
+        while len(self._route_cache) > self.ROUTE_CACHE_SIZE:
+            self._route_cache.popitem(last=False)
+    
+    async def _resolve_speculation(
+        self,
+        speculative_task: asyncio.Task,
+        llm_result: Dict[str, Any],
+        metrics: Any
+    ):
+        """
+        Keep or discard a speculative general agent answer.
+        
+        Args:
+            speculative_task: Task producing the general agent's answer
+            llm_result: LLM routing decision (updated in place on a hit)
+            metrics: Routing operation metrics
+        """
+        spec_hit = llm_result["selected_agent"] == AgentType.GENERAL.value
+        metrics.metadata["spec_hit"] = spec_hit
+        
+        if not spec_hit:
+            speculative_task.cancel()
+            return
+        
+        try:
+            llm_result["speculative_response"] = await speculative_task
+        except Exception as e:
+            # The general agent will simply run again after routing
+            performance_logger.logger.warning(
+                "speculative_execution_failed",
+                error=str(e)
+            )
+    
     def _pattern_based_routing(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Perform pattern-based routing for common queries.
@@ -135,23 +331,30 @@ class OrchestratorAgent(BaseAgent):
         Returns:
             Routing decision or None
         """
-        matches = {}
+        # Count keyword hits per agent in a single pass
+        lookup = self._routing_lookup
+        hits = Counter(
+            lookup[word]
+            for word in _WORD_RE.findall(query.lower())
+            if word in lookup
+        )
         
-        # Check each pattern
-        for agent_type, pattern in self.routing_patterns.items():
-            if pattern.search(query):
-                # Count matches
-                matches[agent_type] = len(pattern.findall(query))
+        # Keep keyword order so ties resolve consistently (most_common is
+        # stable, so equal counts go to the agent inserted first)
+        matches = Counter({
+            agent_type: hits[agent_type]
+            for agent_type in self._routing_order
+            if hits[agent_type]
+        })
         
         if not matches:
             return None
         
         # Select agent with most matches
-        selected_agent = max(matches.items(), key=lambda x: x[1])[0]
+        selected_agent, selected_matches = matches.most_common(1)[0]
         
         # Calculate confidence based on match strength
-        total_matches = sum(matches.values())
-        confidence = matches[selected_agent] / total_matches if total_matches > 0 else 0
+        confidence = selected_matches / matches.total()
         
         # Extract basic parameters
         params = self._extract_basic_params(query, selected_agent)
@@ -159,7 +362,7 @@ class OrchestratorAgent(BaseAgent):
         return {
             "selected_agent": selected_agent.value,
             "confidence": min(confidence * 1.2, 1.0),  # Boost confidence slightly
-            "reasoning": f"Pattern matching identified {matches[selected_agent]} keywords for {selected_agent.value}",
+            "reasoning": f"Pattern matching identified {selected_matches} keywords for {selected_agent.value}",
             "extracted_params": params,
             "method": "pattern"
         }
@@ -182,28 +385,24 @@ class OrchestratorAgent(BaseAgent):
         params = {}
         
         # Extract wallet address if present
-        wallet_pattern = r'0x[a-fA-F0-9]{40}'
-        wallet_match = re.search(wallet_pattern, query)
+        wallet_match = _WALLET_RE.search(query)
         if wallet_match:
             params["wallet_address"] = wallet_match.group()
         
         # Extract token symbols
-        token_pattern = r'\b[A-Z]{2,10}\b'
-        tokens = re.findall(token_pattern, query)
+        tokens = _TOKEN_RE.findall(query)
         if tokens:
             params["tokens"] = tokens
         
         # Extract amounts
-        amount_pattern = r'\b(\d+(?:\.\d+)?)\s*(?:tokens?|eth|bnb|matic|usd[tc]?)\b'
-        amounts = re.findall(amount_pattern, query, re.IGNORECASE)
+        amounts = _AMOUNT_RE.findall(query)
         if amounts:
             params["amounts"] = [float(a) for a in amounts]
         
         # Agent-specific extraction
         if agent_type == AgentType.SWAP:
             # Extract from/to tokens
-            swap_pattern = r'(?:swap|exchange|convert)\s+(\d*\.?\d*\s*)?(\w+)\s+(?:to|for)\s+(\w+)'
-            swap_match = re.search(swap_pattern, query, re.IGNORECASE)
+            swap_match = _SWAP_RE.search(query)
             if swap_match:
                 if swap_match.group(1):
                     params["amount"] = float(swap_match.group(1).strip())
@@ -228,75 +427,19 @@ class OrchestratorAgent(BaseAgent):
             Routing decision
         """
         # Prepare the routing prompt
-        routing_prompt = f"""Analyze this user query and determine which specialized agent should handle it.
-
-User Query: {query}
-
-Context: {json.dumps(context or {}, indent=2)}
-
-Available Agents:
-1. portfolio - Portfolio analysis, balance checks, holdings overview
-2. rebalancing - Portfolio optimization and rebalancing suggestions  
-3. swap - Token swaps, quotes, and exchange operations
-4. general - General DeFi questions, education, and other queries
-
-Respond with ONLY a JSON object in this exact format:
-{{
-    "selected_agent": "agent_name",
-    "confidence": 0.8,
-    "reasoning": "Brief explanation",
-    "extracted_params": {{}}
-}}"""
+        routing_prompt = (
+            f"{self._ROUTING_PROMPT_PREFIX}"
+            f"{self._build_routing_prompt(query, context)}"
+            f"{self._ROUTING_PROMPT_SUFFIX}"
+        )
         
         try:
             # Invoke the LLM
             response = await self.invoke(routing_prompt)
             
-            # Extract JSON from response - try multiple methods
-            content = response.content.strip()
-            
-            # Method 1: Try to parse the entire content as JSON
-            try:
-                result = json.loads(content)
-            except json.JSONDecodeError:
-                # Method 2: Find JSON block in markdown code block
-                json_block_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-                if json_block_match:
-                    result = json.loads(json_block_match.group(1))
-                else:
-                    # Method 3: Find first complete JSON object
-                    # This regex finds a JSON object by matching balanced braces
-                    brace_count = 0
-                    start_idx = content.find('{')
-                    if start_idx == -1:
-                        raise ValueError("No JSON object found in response")
-                    
-                    for i, char in enumerate(content[start_idx:], start_idx):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                json_str = content[start_idx:i+1]
-                                result = json.loads(json_str)
-                                break
-                    else:
-                        raise ValueError("Unclosed JSON object in response")
-                
-                # Validate and normalize result
-                if "selected_agent" not in result:
-                    raise ValueError("Missing selected_agent in response")
-                
-                # Ensure agent type is valid
-                selected = result["selected_agent"]
-                valid_agents = [a.value for a in AgentType if a != AgentType.ORCHESTRATOR]
-                if selected not in valid_agents:
-                    result["selected_agent"] = AgentType.GENERAL.value
-                    result["confidence"] = 0.5
-                
-                return result
-            else:
-                raise ValueError("No JSON found in response")
+            return self._normalize_routing_result(
+                self._decode_json(response.content)
+            )
                 
         except Exception as e:
             performance_logger.logger.error(
@@ -310,9 +453,60 @@ Respond with ONLY a JSON object in this exact format:
                 "selected_agent": AgentType.GENERAL.value,
                 "confidence": 0.3,
                 "reasoning": f"LLM routing failed: {str(e)}",
-                "extracted_params": {}
+                "extracted_params": {},
+                "error": str(e)
             }
     
+    def _build_routing_prompt(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]]
+    ) -> str:
+        """Build the dynamic part of a routing prompt for one query."""
+        if not context:
+            return f"User Query: {query}"
+        return f"User Query: {query}\n\nContext: {dumps_json(context)}"
+    
+    def _normalize_routing_result(self, result: Any) -> Dict[str, Any]:
+        """
+        Validate and normalize a routing decision parsed from the LLM.
+        
+        Args:
+            result: Parsed decision
+            
+        Returns:
+            Routing decision
+        """
+        if not isinstance(result, dict) or "selected_agent" not in result:
+            raise ValueError("Missing selected_agent in response")
+        
+        # Ensure agent type is valid
+        selected = result["selected_agent"]
+        if not isinstance(selected, str) or selected not in _VALID_AGENT_VALUES:
+            result["selected_agent"] = AgentType.GENERAL.value
+            result["confidence"] = 0.5
+        
+        return result
+    
+    def _decode_json(self, content: str) -> Any:
+        """
+        Decode the first JSON object in a response.
+        
+        Args:
+            content: LLM response content
+            
+        Returns:
+            Parsed JSON value
+        """
+        # Strip markdown code fences
+        content = content.replace("```json", "").replace("```", "")
+        start_idx = content.find('{')
+        if start_idx == -1:
+            raise ValueError("No JSON object found in response")
+        
+        result, _ = _JSON_DECODER.raw_decode(content, start_idx)
+        return result
+    
     async def analyze_routing_options(
         self,
         query: str
@@ -328,18 +522,18 @@ Respond with ONLY a JSON object in this exact format:
         """
         options = []
         
+        # Split once and test each distinct word once per agent
+        keywords = query.lower().split()
+        word_counts = Counter(keywords)
+        
         # Check each agent type
-        for agent_type in AgentType:
-            if agent_type == AgentType.ORCHESTRATOR:
-                continue
-            
+        for agent_type, matcher in self._option_matchers:
             config = agent_config_manager.get_config(agent_type)
             
-            # Calculate keyword match score
-            keywords = query.lower().split()
-            agent_keywords = [k.lower() for k in config.routing_keywords]
-            
-            matches = sum(1 for k in keywords if any(ak in k for ak in agent_keywords))
+            # Calculate keyword match score (a word matches if it contains
+            # any of the agent's keywords)
+            search = matcher.search
+            matches = sum(n for word, n in word_counts.items() if search(word))
             score = matches / len(keywords) if keywords else 0
             
             options.append({
@@ -1,12 +1,15 @@
 """Portfolio analysis agent."""
 
-import json
+import asyncio
+import copy
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_core.tools import Tool
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, dumps_json, get_chain_name, loads_json
 from app.agents.config import AgentType, agent_config_manager
 from app.services.performance_logger import performance_logger
 
@@ -14,6 +17,57 @@ from app.services.performance_logger import performance_logger
 class PortfolioAgent(BaseAgent):
     """Agent specialized in portfolio analysis and insights."""
     
+    # Prompt templates. Static instructions come first so requests share an
+    # identical prefix for provider prompt caching; request data goes last.
+    _HOLDINGS_PROMPT = """Analyze the portfolio data below based on the user's query.
+
+Provide insights on:
+1. Portfolio composition and diversification
+2. Risk factors and concentration
+3. Notable holdings and their significance
+4. Recommendations based on the data
+
+Keep the analysis concise and actionable.
+
+User Query: {query}
+Focus Area: {focus}
+
+Portfolio Data:
+{portfolio}"""
+    
+    _IMPROVEMENTS_PROMPT = """Based on the portfolio data below, suggest improvements.
+
+Provide specific, actionable suggestions for:
+1. Improving diversification
+2. Optimizing for the stated goals
+3. Managing risk appropriately
+4. Potential rebalancing opportunities
+
+Consider gas costs and practical implementation.
+
+User Profile:
+- Risk Tolerance: {risk_tolerance}
+- Goals: {goals}
+
+Portfolio Data:
+{portfolio}"""
+    
+    _TOKEN_PROMPT = """Explain the token below for a DeFi investor:
+
+1. What it is and its primary use case
+2. Key risks associated with holding it
+3. Historical performance and volatility
+4. Role in a DeFi portfolio
+5. Any important considerations
+
+Keep the explanation clear and focused on practical information.
+
+Token: {token}"""
+    
+    # Portfolio summary cache bounds
+    SUMMARY_CACHE_SIZE = 256
+    SUMMARY_CACHE_TTL = 30  # seconds
+    
     def __init__(self, tools: Optional[List[Tool]] = None):
         """
         Initialize the portfolio agent.
@@ -31,6 +85,12 @@ class PortfolioAgent(BaseAgent):
             tools=tools
         )
         self.config = config
+        
+        # Recent summaries: (wallet, chains) -> (fetched at, summary)
+        self._summary_cache: "OrderedDict[Tuple[str, Tuple[int, ...]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # Fetches in progress, shared by concurrent callers for the same key
+        self._summary_fetches: Dict[Tuple[str, Tuple[int, ...]], asyncio.Future] = {}
     
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt."""
@@ -85,10 +145,7 @@ class PortfolioAgent(BaseAgent):
                     metrics.metadata["has_data"] = False
                 
                 # Extract response text
-                if hasattr(response, 'content'):
-                    return response.content
-                else:
-                    return str(response)
+                return self._response_text(response)
                     
             except Exception as e:
                 performance_logger.logger.error(
@@ -119,33 +176,30 @@ class PortfolioAgent(BaseAgent):
             if "current_prices" in context:
                 parts.append(f"Current market data available: Yes")
             if "user_preferences" in context:
-                parts.append(f"User preferences: {json.dumps(context['user_preferences'])}")
+                parts.append(f"User preferences: {dumps_json(context['user_preferences'])}")
         
         return "\n".join(parts)
     
     def _get_chain_names(self, chain_ids: List[int]) -> List[str]:
         """Get chain names from IDs."""
-        chain_map = {
-            1: "Ethereum",
-            137: "Polygon",
-            10: "Optimism",
-            42161: "Arbitrum",
-            56: "BSC",
-            43114: "Avalanche"
-        }
-        return [chain_map.get(cid, f"Chain {cid}") for cid in chain_ids]
+        return [get_chain_name(cid) for cid in chain_ids]
     
     async def get_portfolio_summary(
         self,
         wallet_address: str,
-        chain_ids: Optional[List[int]] = None
+        chain_ids: Optional[List[int]] = None,
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Get a structured portfolio summary.
         
+        Summaries are cached for SUMMARY_CACHE_TTL seconds, and concurrent
+        requests for the same wallet and chains share one fetch.
+        
         Args:
             wallet_address: Wallet to analyze
             chain_ids: Chains to include
+            refresh: Bypass the cache and fetch fresh data
             
         Returns:
             Portfolio summary data
@@ -157,10 +211,7 @@ class PortfolioAgent(BaseAgent):
             }
         
         # Use get_portfolio tool
-        get_portfolio_tool = next(
-            (t for t in self.tools if t.name == "get_portfolio"),
-            None
-        )
+        get_portfolio_tool = self.get_tool("get_portfolio")
         
         if not get_portfolio_tool:
             return {
@@ -168,6 +219,38 @@ class PortfolioAgent(BaseAgent):
                 "wallet_address": wallet_address
             }
         
+        key = (wallet_address.lower(), tuple(chain_ids or ()))
+        
+        if not refresh:
+            cached = self._get_cached_summary(key)
+            if cached is not None:
+                return cached
+        
+        # Join a fetch already in progress for this key, or start one
+        fetch = self._summary_fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(
+                self._fetch_portfolio_summary(
+                    get_portfolio_tool, wallet_address, chain_ids, key
+                )
+            )
+            self._summary_fetches[key] = fetch
+            fetch.add_done_callback(
+                lambda _, key=key: self._summary_fetches.pop(key, None)
+            )
+        
+        # Shielded so one cancelled caller doesn't cancel the shared fetch
+        summary = await asyncio.shield(fetch)
+        return copy.deepcopy(summary)
+    
+    async def _fetch_portfolio_summary(
+        self,
+        get_portfolio_tool: Tool,
+        wallet_address: str,
+        chain_ids: Optional[List[int]],
+        key: Tuple[str, Tuple[int, ...]]
+    ) -> Dict[str, Any]:
+        """Fetch a portfolio summary through the tool and cache it."""
         try:
             # Call tool directly
             portfolio_data = await get_portfolio_tool.ainvoke({
@@ -175,8 +258,10 @@ class PortfolioAgent(BaseAgent):
                 "chain_ids": chain_ids
             })
             
-            # Process and return
-            return self._process_portfolio_data(portfolio_data)
+            # Process, cache and return
+            summary = self._process_portfolio_data(portfolio_data)
+            self._cache_summary(key, summary)
+            return summary
             
         except Exception as e:
             performance_logger.logger.error(
@@ -189,11 +274,44 @@ class PortfolioAgent(BaseAgent):
                 "wallet_address": wallet_address
             }
     
+    def _get_cached_summary(
+        self,
+        key: Tuple[str, Tuple[int, ...]]
+    ) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached portfolio summary if still fresh."""
+        entry = self._summary_cache.get(key)
+        if entry is None:
+            return None
+        
+        fetched_at, summary = entry
+        if time.monotonic() - fetched_at >= self.SUMMARY_CACHE_TTL:
+            del self._summary_cache[key]
+            return None
+        
+        self._summary_cache.move_to_end(key)
+        return copy.deepcopy(summary)
+    
+    def _cache_summary(
+        self,
+        key: Tuple[str, Tuple[int, ...]],
+        summary: Dict[str, Any]
+    ):
+        """Cache a portfolio summary (failed summaries are not cached)."""
+        if "error" in summary:
+            return
+        
+        self._summary_cache[key] = (time.monotonic(), summary)
+        self._summary_cache.move_to_end(key)
+        
+        while len(self._summary_cache) > self.SUMMARY_CACHE_SIZE:
+            self._summary_cache.popitem(last=False)
+    
     def _process_portfolio_data(self, raw_data: Any) -> Dict[str, Any]:
         """Process raw portfolio data into structured format."""
-        if isinstance(raw_data, str):
+        # Byte payloads go straight to the parser without a decode copy
+        if isinstance(raw_data, (str, bytes, bytearray)):
             try:
-                data = json.loads(raw_data)
+                data = loads_json(raw_data)
             except:
                 return {"error": "Invalid portfolio data format"}
         else:
@@ -205,7 +323,7 @@ class PortfolioAgent(BaseAgent):
             "chain_breakdown": data.get("chain_breakdown", {}),
             "top_holdings": data.get("top_holdings", []),
             "token_count": len(data.get("tokens", [])),
-            "last_updated": datetime.utcnow().isoformat()
+            "last_updated": datetime.now(timezone.utc).isoformat(timespec="seconds")
         }
         
         return summary
@@ -228,24 +346,14 @@ class PortfolioAgent(BaseAgent):
             Analysis response
         """
         # Build analysis prompt
-        prompt = f"""Analyze the following portfolio data based on the user's query.
-
-User Query: {query}
-Focus Area: {focus or "general analysis"}
-
-Portfolio Data:
-{json.dumps(portfolio_data, indent=2)}
-
-Provide insights on:
-1. Portfolio composition and diversification
-2. Risk factors and concentration
-3. Notable holdings and their significance
-4. Recommendations based on the data
-
-Keep the analysis concise and actionable."""
+        prompt = self._HOLDINGS_PROMPT.format(
+            query=query,
+            focus=focus or "general analysis",
+            portfolio=dumps_json(portfolio_data)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def compare_portfolios(
         self,
@@ -268,18 +376,28 @@ Keep the analysis concise and actionable."""
             return "Portfolio comparison requires access to portfolio data tools."
         
         try:
-            # Get both portfolios
-            portfolio1 = await self.get_portfolio_summary(wallet1, chain_ids)
-            portfolio2 = await self.get_portfolio_summary(wallet2, chain_ids)
+            # Get both portfolios concurrently
+            results = await asyncio.gather(
+                self.get_portfolio_summary(wallet1, chain_ids),
+                self.get_portfolio_summary(wallet2, chain_ids),
+                return_exceptions=True
+            )
+            
+            # A failed fetch is reported in the prompt rather than aborting
+            portfolio1, portfolio2 = (
+                {"error": str(result), "wallet_address": wallet}
+                if isinstance(result, Exception) else result
+                for wallet, result in zip((wallet1, wallet2), results, strict=True)
+            )
             
             # Build comparison prompt
             prompt = f"""Compare these two DeFi portfolios:
 
 Portfolio 1 ({wallet1[:8]}...{wallet1[-6:]}):
-{json.dumps(portfolio1, indent=2)}
+{dumps_json(portfolio1)}
 
 Portfolio 2 ({wallet2[:8]}...{wallet2[-6:]}):
-{json.dumps(portfolio2, indent=2)}
+{dumps_json(portfolio2)}
 
 Provide a comparison including:
 1. Total value differences
@@ -289,7 +407,7 @@ Provide a comparison including:
 5. Key differences in holdings"""
             
             response = await self.invoke(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
+            return self._response_text(response)
             
         except Exception as e:
             return f"Failed to compare portfolios: {str(e)}"
@@ -313,25 +431,14 @@ Provide a comparison including:
         """
         goals_str = ", ".join(goals) if goals else "general portfolio optimization"
         
-        prompt = f"""Based on this portfolio data, suggest improvements:
-
-Portfolio Data:
-{json.dumps(portfolio_data, indent=2)}
-
-User Profile:
-- Risk Tolerance: {risk_tolerance}
-- Goals: {goals_str}
-
-Provide specific, actionable suggestions for:
-1. Improving diversification
-2. Optimizing for the stated goals
-3. Managing risk appropriately
-4. Potential rebalancing opportunities
-
-Consider gas costs and practical implementation."""
+        prompt = self._IMPROVEMENTS_PROMPT.format(
+            risk_tolerance=risk_tolerance,
+            goals=goals_str,
+            portfolio=dumps_json(portfolio_data)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def explain_token(
         self,
@@ -348,18 +455,10 @@ Consider gas costs and practical implementation."""
         Returns:
             Token explanation
         """
-        prompt = f"""Explain the {token_symbol} token for a DeFi investor:
-
-1. What is {token_symbol} and its primary use case?
-2. Key risks associated with holding {token_symbol}
-3. Historical performance and volatility
-4. Role in a DeFi portfolio
-5. Any important considerations
-
-Keep the explanation clear and focused on practical information."""
+        prompt = self._TOKEN_PROMPT.format(token=token_symbol)
         
         if context and "token_data" in context:
-            prompt += f"\n\nAdditional token data:\n{json.dumps(context['token_data'], indent=2)}"
+            prompt += f"\n\nAdditional token data:\n{dumps_json(context['token_data'])}"
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
\ No newline at end of file
+        return self._response_text(response)
\ No newline at end of file
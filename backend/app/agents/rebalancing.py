@@ -1,16 +1,20 @@
 """Rebalancing suggestion agent."""
 
-import json
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
+from datetime import datetime, timezone
+import numpy as np
+from langchain_core.messages import HumanMessage
 from langchain_core.tools import Tool
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, dumps_json, loads_json
 from app.agents.config import AgentType, agent_config_manager
 from app.services.performance_logger import performance_logger
 
 
-@dataclass
+@dataclass(slots=True)
 class RebalanceStrategy:
     """Rebalancing strategy details."""
     name: str
@@ -35,6 +39,112 @@ class RebalancingAgent(BaseAgent):
         "yield_optimized": "Maximize yield farming opportunities"
     }
     
+    # Strategies compared when the caller doesn't choose
+    DEFAULT_COMPARE_STRATEGIES = ("equal_weight", "risk_parity", "defi_blue_chip")
+    
+    # Upper bound on concurrent strategy analyses (provider rate limits)
+    MAX_PARALLEL_STRATEGIES = 5
+    
+    # Monitoring assessments are reused until progress moves by at least
+    # ASSESSMENT_PROGRESS_DELTA points or the TTL expires
+    ASSESSMENT_CACHE_SIZE = 256
+    ASSESSMENT_CACHE_TTL = 60  # seconds
+    ASSESSMENT_PROGRESS_DELTA = 2.0
+    
+    # Executions whose starting drift is remembered for progress tracking
+    TRACKED_EXECUTIONS = 256
+    
+    # Prompt templates. Static instructions come first so requests share an
+    # identical prefix for provider prompt caching; request data goes last.
+    _STRATEGY_PROMPT = """Analyze a rebalancing strategy for the portfolio below.
+
+Provide a JSON response with:
+{{
+    "target_allocations": {{"TOKEN": percentage}},
+    "required_swaps": [{{"from": "TOKEN", "to": "TOKEN", "amount_usd": value}}],
+    "estimated_cost_usd": value,
+    "risk_score": 0-10,
+    "rationale": "explanation"
+}}
+
+Strategy: {strategy} - {description}
+
+Portfolio Data:
+{portfolio}"""
+    
+    _BATCH_STRATEGY_PROMPT = """Analyze each rebalancing strategy listed below for the given portfolio.
+
+Provide a single JSON object keyed by strategy name, with one entry per strategy:
+{{
+    "strategy_name": {{
+        "target_allocations": {{"TOKEN": percentage}},
+        "required_swaps": [{{"from": "TOKEN", "to": "TOKEN", "amount_usd": value}}],
+        "estimated_cost_usd": value,
+        "risk_score": 0-10,
+        "rationale": "explanation"
+    }}
+}}
+
+Strategies:
+{strategies}
+
+Portfolio Data:
+{portfolio}"""
+    
+    _IMPACT_PROMPT = """Calculate the impact of rebalancing the portfolio below.
+
+Analyze:
+1. Number and size of required trades
+2. Total transaction costs (gas + DEX fees)
+3. Expected slippage impact
+4. Tax implications (if applicable)
+5. Time to execute all trades
+6. Risk during rebalancing period
+
+Provide specific numbers and estimates.
+
+Include Tax Considerations: {include_tax}
+
+Current Portfolio:
+{portfolio}
+
+Target Allocations:
+{targets}"""
+    
+    _EXECUTION_PLAN_PROMPT = """Create a detailed execution plan for rebalancing the portfolio below.
+
+Create a step-by-step plan including:
+1. Exact trades to execute (with amounts)
+2. Optimal execution order
+3. DEX recommendations for each trade
+4. Gas optimization strategies
+5. Risk mitigation steps
+6. Monitoring requirements
+
+Be specific and actionable.
+
+Parameters:
+- Maximum Slippage: {max_slippage}%
+- Time Horizon: {time_horizon}
+- Available Tools: {tool_count}
+
+Current Portfolio:
+{portfolio}
+
+Target Allocations:
+{targets}"""
+    
+    _MONITOR_PROMPT = """Monitor the rebalancing execution below.
+
+Provide:
+1. Assessment of progress
+2. Any concerns or risks
+3. Recommendations for next steps
+
+Progress: {progress}%
+Current State: {current}
+Target State: {target}"""
+    
     def __init__(self, tools: Optional[List[Tool]] = None):
         """
         Initialize the rebalancing agent.
@@ -52,6 +162,13 @@ class RebalancingAgent(BaseAgent):
             tools=tools
         )
         self.config = config
+        
+        # Latest monitoring assessment per execution:
+        # execution id -> (assessed at, progress, assessment)
+        self._assessment_cache: "OrderedDict[str, Tuple[float, float, str]]" = OrderedDict()
+        
+        # Allocation drift at the first poll of each execution
+        self._initial_drifts: "OrderedDict[str, float]" = OrderedDict()
     
     def _get_default_system_prompt(self) -> str:
         """Get the default system prompt."""
@@ -98,7 +215,7 @@ class RebalancingAgent(BaseAgent):
                     response = await self.invoke(prompt)
                     metrics.metadata["tools_used"] = 0
                 
-                return response.content if hasattr(response, 'content') else str(response)
+                return self._response_text(response)
                 
             except Exception as e:
                 performance_logger.logger.error(
@@ -128,10 +245,10 @@ class RebalancingAgent(BaseAgent):
             
             # Show current allocations
             parts.append("\nCurrent Allocations:")
-            for token in portfolio_data.get("tokens", [])[:10]:  # Top 10
-                if "value_usd" in token and portfolio_data.get("total_value_usd", 0) > 0:
-                    allocation = (token["value_usd"] / portfolio_data["total_value_usd"]) * 100
-                    parts.append(f"- {token['symbol']}: {allocation:.1f}%")
+            parts.extend(self._top_allocations(
+                portfolio_data["tokens"],
+                portfolio_data.get("total_value_usd", 0)
+            ))
         
         # Add strategy and constraints
         parts.append(f"\nRisk Tolerance: {risk_tolerance}")
@@ -142,7 +259,7 @@ class RebalancingAgent(BaseAgent):
                 parts.append(f"Strategy Description: {self.STRATEGIES[strategy]}")
         
         if constraints:
-            parts.append(f"\nConstraints: {json.dumps(constraints, indent=2)}")
+            parts.append(f"\nConstraints: {dumps_json(constraints)}")
         
         # Add specific instructions
         parts.append("""
@@ -156,6 +273,47 @@ Please provide:
         
         return "\n".join(parts)
     
+    def _top_allocations(
+        self,
+        tokens: List[Dict[str, Any]],
+        total_value: float,
+        limit: int = 10
+    ) -> List[str]:
+        """
+        Format the largest holdings as allocation lines.
+        
+        Args:
+            tokens: Token holdings
+            total_value: Total portfolio value in USD
+            limit: Maximum number of holdings to list
+            
+        Returns:
+            Allocation lines, largest first
+        """
+        if not total_value or total_value <= 0:
+            return []
+        
+        valued = [token for token in tokens if "value_usd" in token]
+        if not valued:
+            return []
+        
+        values = np.fromiter(
+            (token["value_usd"] for token in valued),
+            dtype=np.float64,
+            count=len(valued)
+        )
+        
+        # Partial selection of the top holdings, then order just those
+        k = min(limit, values.size)
+        top = np.argpartition(-values, k - 1)[:k]
+        top = top[np.argsort(-values[top], kind="stable")]
+        allocations = values[top] * (100.0 / total_value)
+        
+        return [
+            f"- {valued[i]['symbol']}: {allocation:.1f}%"
+            for i, allocation in zip(top.tolist(), allocations.tolist(), strict=True)
+        ]
+    
     async def analyze_rebalancing_strategies(
         self,
         portfolio_data: Dict[str, Any],
@@ -172,46 +330,37 @@ Please provide:
             List of analyzed strategies
         """
         if not compare_strategies:
-            compare_strategies = ["equal_weight", "risk_parity", "defi_blue_chip"]
+            compare_strategies = self.DEFAULT_COMPARE_STRATEGIES
+        
+        # Strategies are independent, so analyze them in one concurrent batch
+        names = [name for name in compare_strategies if name in self.STRATEGIES]
+        if not names:
+            return []
+        
+        portfolio_json = dumps_json(portfolio_data)
+        message_batches = [
+            [HumanMessage(content=self._build_strategy_prompt(name, portfolio_json))]
+            for name in names
+        ]
+        
+        try:
+            responses = await self.batch_invoke(
+                message_batches,
+                max_concurrency=self.MAX_PARALLEL_STRATEGIES
+            )
+        except Exception as e:
+            responses = [e] * len(names)
         
         strategies = []
         
-        for strategy_name in compare_strategies:
-            if strategy_name not in self.STRATEGIES:
-                continue
-            
-            # Analyze each strategy
-            prompt = f"""Analyze the {strategy_name} rebalancing strategy for this portfolio:
-
-Portfolio Data:
-{json.dumps(portfolio_data, indent=2)}
-
-Strategy: {strategy_name} - {self.STRATEGIES[strategy_name]}
-
-Provide a JSON response with:
-{{
-    "target_allocations": {{"TOKEN": percentage}},
-    "required_swaps": [{{"from": "TOKEN", "to": "TOKEN", "amount_usd": value}}],
-    "estimated_cost_usd": value,
-    "risk_score": 0-10,
-    "rationale": "explanation"
-}}"""
-            
+        for strategy_name, response in zip(names, responses, strict=True):
             try:
-                response = await self.invoke(prompt)
+                if isinstance(response, Exception):
+                    raise response
                 
                 # Parse response
-                json_match = json.loads(self._extract_json(response.content))
-                
-                strategy = RebalanceStrategy(
-                    name=strategy_name,
-                    target_allocations=json_match.get("target_allocations", {}),
-                    required_swaps=json_match.get("required_swaps", []),
-                    estimated_cost_usd=json_match.get("estimated_cost_usd", 0),
-                    risk_score=json_match.get("risk_score", 5),
-                    rationale=json_match.get("rationale", "")
-                )
-                strategies.append(strategy)
+                json_match = loads_json(self._extract_json(response.content))
+                strategies.append(self._build_strategy(strategy_name, json_match))
                 
             except Exception as e:
                 performance_logger.logger.error(
@@ -222,12 +371,123 @@ Provide a JSON response with:
         
         return strategies
     
+    async def analyze_rebalancing_strategies_batched(
+        self,
+        portfolio_data: Dict[str, Any],
+        compare_strategies: Optional[List[str]] = None
+    ) -> List[RebalanceStrategy]:
+        """
+        Analyze multiple rebalancing strategies with a single LLM call.
+        
+        Costs one round-trip instead of one per strategy. Strategies missing
+        from (or malformed in) the combined response are analyzed separately
+        via analyze_rebalancing_strategies.
+        
+        Args:
+            portfolio_data: Current portfolio
+            compare_strategies: Strategies to compare
+            
+        Returns:
+            List of analyzed strategies
+        """
+        if not compare_strategies:
+            compare_strategies = self.DEFAULT_COMPARE_STRATEGIES
+        
+        names = [name for name in compare_strategies if name in self.STRATEGIES]
+        if not names:
+            return []
+        
+        prompt = self._BATCH_STRATEGY_PROMPT.format(
+            strategies="\n".join(
+                f"- {name}: {self.STRATEGIES[name]}" for name in names
+            ),
+            portfolio=dumps_json(portfolio_data)
+        )
+        
+        analyzed: Dict[str, RebalanceStrategy] = {}
+        try:
+            response = await self.invoke(prompt)
+            results = loads_json(self._extract_json(self._response_text(response)))
+            
+            for name in names:
+                result = results.get(name)
+                if isinstance(result, dict):
+                    analyzed[name] = self._build_strategy(name, result)
+                    
+        except Exception as e:
+            performance_logger.logger.error(
+                "batched_strategy_analysis_failed",
+                strategies=names,
+                error=str(e)
+            )
+        
+        # Fall back to per-strategy calls for anything the batch didn't cover
+        missing = [name for name in names if name not in analyzed]
+        if missing:
+            for strategy in await self.analyze_rebalancing_strategies(
+                portfolio_data, missing
+            ):
+                analyzed[strategy.name] = strategy
+        
+        return [analyzed[name] for name in names if name in analyzed]
+    
+    def _build_strategy(self, strategy_name: str, result: Dict[str, Any]) -> RebalanceStrategy:
+        """Build a strategy from its parsed LLM analysis."""
+        return RebalanceStrategy(
+            name=strategy_name,
+            target_allocations=result.get("target_allocations", {}),
+            required_swaps=result.get("required_swaps", []),
+            estimated_cost_usd=result.get("estimated_cost_usd", 0),
+            risk_score=result.get("risk_score", 5),
+            rationale=result.get("rationale", "")
+        )
+    
+    def _build_strategy_prompt(self, strategy_name: str, portfolio_json: str) -> str:
+        """Build the analysis prompt for a single strategy."""
+        return self._STRATEGY_PROMPT.format(
+            strategy=strategy_name,
+            description=self.STRATEGIES[strategy_name],
+            portfolio=portfolio_json
+        )
+    
     def _extract_json(self, text: str) -> str:
-        """Extract JSON from text response."""
-        import re
-        json_match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
-        if json_match:
-            return json_match.group()
+        """
+        Extract the first JSON object from a text response.
+        
+        Scans for the matching closing brace in a single pass, so nested
+        objects are returned whole. Braces inside string literals are ignored.
+        
+        Args:
+            text: LLM response text
+            
+        Returns:
+            JSON object text, or "{}" if none is found
+        """
+        start = text.find('{')
+        if start < 0:
+            return "{}"
+        
+        depth = 0
+        in_string = False
+        escaped = False
+        for i in range(start, len(text)):
+            char = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        
         return "{}"
     
     async def calculate_rebalancing_impact(
@@ -247,37 +507,30 @@ Provide a JSON response with:
         Returns:
             Impact analysis
         """
-        prompt = f"""Calculate the impact of rebalancing this portfolio:
-
-Current Portfolio:
-{json.dumps(current_portfolio, indent=2)}
-
-Target Allocations:
-{json.dumps(target_allocations, indent=2)}
-
-Include Tax Considerations: {include_tax}
-
-Analyze:
-1. Number and size of required trades
-2. Total transaction costs (gas + DEX fees)
-3. Expected slippage impact
-4. Tax implications (if applicable)
-5. Time to execute all trades
-6. Risk during rebalancing period
-
-Provide specific numbers and estimates."""
+        prompt = self._IMPACT_PROMPT.format(
+            include_tax=include_tax,
+            portfolio=dumps_json(current_portfolio),
+            targets=dumps_json(target_allocations)
+        )
         
         response = await self.invoke(prompt)
         
         # Structure the impact analysis
         impact = {
-            "summary": response.content if hasattr(response, 'content') else str(response),
+            "summary": self._response_text(response),
             "current_value": current_portfolio.get("total_value_usd", 0),
             "target_allocations": target_allocations,
             "include_tax": include_tax,
-            "timestamp": performance_logger.logger.info("impact_calculated").get("timestamp")
+            "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
+        performance_logger.log_custom(
+            "impact_calculated",
+            agent=self.name,
+            target_count=len(target_allocations),
+            include_tax=include_tax
+        )
+        
         return impact
     
     async def generate_execution_plan(
@@ -299,40 +552,16 @@ Provide specific numbers and estimates."""
         Returns:
             Execution plan
         """
-        # Get swap quotes if tools available
-        swap_quotes = []
-        if self.tools:
-            swap_tool = next((t for t in self.tools if t.name == "get_swap_quote"), None)
-            if swap_tool:
-                # Calculate required swaps
-                # This is simplified - real implementation would be more complex
-                swap_quotes.append("Swap quotes available via tools")
-        
-        prompt = f"""Create a detailed execution plan for rebalancing:
-
-Current Portfolio:
-{json.dumps(portfolio_data, indent=2)}
-
-Target Allocations:
-{json.dumps(target_allocations, indent=2)}
-
-Parameters:
-- Maximum Slippage: {max_slippage}%
-- Time Horizon: {time_horizon}
-- Available Tools: {len(self.tools) if self.tools else 0}
-
-Create a step-by-step plan including:
-1. Exact trades to execute (with amounts)
-2. Optimal execution order
-3. DEX recommendations for each trade
-4. Gas optimization strategies
-5. Risk mitigation steps
-6. Monitoring requirements
-
-Be specific and actionable."""
+        prompt = self._EXECUTION_PLAN_PROMPT.format(
+            max_slippage=max_slippage,
+            time_horizon=time_horizon,
+            tool_count=len(self.tools),
+            portfolio=dumps_json(portfolio_data),
+            targets=dumps_json(target_allocations)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def monitor_rebalancing(
         self,
@@ -352,7 +581,9 @@ Be specific and actionable."""
             Monitoring status
         """
         # Calculate progress
-        progress = self._calculate_rebalancing_progress(current_state, target_state)
+        progress = self._calculate_rebalancing_progress(
+            execution_id, current_state, target_state
+        )
         
         status = {
             "execution_id": execution_id,
@@ -365,28 +596,108 @@ Be specific and actionable."""
         
         # Get AI recommendations if needed
         if progress < 95:
-            prompt = f"""Monitor this rebalancing execution:
-
-Progress: {progress}%
-Current State: {json.dumps(current_state, indent=2)}
-Target State: {json.dumps(target_state, indent=2)}
-
-Provide:
-1. Assessment of progress
-2. Any concerns or risks
-3. Recommendations for next steps"""
+            # Polls between meaningful changes reuse the last assessment
+            assessment = self._get_cached_assessment(execution_id, progress)
+            if assessment is None:
+                prompt = self._MONITOR_PROMPT.format(
+                    progress=progress,
+                    current=dumps_json(current_state),
+                    target=dumps_json(target_state)
+                )
+                
+                response = await self.invoke(prompt)
+                assessment = self._response_text(response)
+                self._cache_assessment(execution_id, progress, assessment)
             
-            response = await self.invoke(prompt)
-            status["ai_assessment"] = response.content if hasattr(response, 'content') else str(response)
+            status["ai_assessment"] = assessment
         
         return status
     
+    def _get_cached_assessment(self, execution_id: str, progress: float) -> Optional[str]:
+        """Get the last assessment for an execution if progress hasn't moved."""
+        entry = self._assessment_cache.get(execution_id)
+        if entry is None:
+            return None
+        
+        assessed_at, assessed_progress, assessment = entry
+        if (
+            time.monotonic() - assessed_at >= self.ASSESSMENT_CACHE_TTL
+            or abs(progress - assessed_progress) >= self.ASSESSMENT_PROGRESS_DELTA
+        ):
+            del self._assessment_cache[execution_id]
+            return None
+        
+        self._assessment_cache.move_to_end(execution_id)
+        return assessment
+    
+    def _cache_assessment(self, execution_id: str, progress: float, assessment: str):
+        """Remember the latest assessment for an execution."""
+        self._assessment_cache[execution_id] = (time.monotonic(), progress, assessment)
+        self._assessment_cache.move_to_end(execution_id)
+        
+        while len(self._assessment_cache) > self.ASSESSMENT_CACHE_SIZE:
+            self._assessment_cache.popitem(last=False)
+    
     def _calculate_rebalancing_progress(
         self,
+        execution_id: str,
         current: Dict[str, Any],
         target: Dict[str, Any]
     ) -> float:
-        """Calculate rebalancing progress percentage."""
-        # Simplified progress calculation
-        # Real implementation would compare actual vs target allocations
-        return 50.0  # Placeholder
\ No newline at end of file
+        """
+        Calculate rebalancing progress percentage.
+        
+        Progress is the share of the starting drift that has been closed,
+        where drift is the L1 distance between current and target allocation
+        percentages held under each state's "allocations" map. The starting
+        drift is read from current["initial_drift"] when the caller tracks
+        it, otherwise it is the drift measured at the execution's first poll.
+        
+        Args:
+            execution_id: ID of the rebalancing execution
+            current: Current portfolio state
+            target: Target portfolio state
+            
+        Returns:
+            Progress percentage between 0 and 100
+        """
+        current_allocations = current.get("allocations") or {}
+        target_allocations = target.get("allocations") or {}
+        
+        # Nothing to measure against yet
+        if not target_allocations:
+            return 0.0
+        
+        symbols = list(current_allocations.keys() | target_allocations.keys())
+        
+        current_values = np.fromiter(
+            (current_allocations.get(symbol, 0.0) for symbol in symbols),
+            dtype=np.float64,
+            count=len(symbols)
+        )
+        target_values = np.fromiter(
+            (target_allocations.get(symbol, 0.0) for symbol in symbols),
+            dtype=np.float64,
+            count=len(symbols)
+        )
+        drift = float(np.abs(current_values - target_values).sum())
+        
+        initial_drift = current.get("initial_drift")
+        if initial_drift is None:
+            initial_drift = self._initial_drift(execution_id, drift)
+        
+        if initial_drift <= 0:
+            return 100.0 if drift <= 0 else 0.0
+        return float(np.clip(100.0 * (1.0 - drift / initial_drift), 0.0, 100.0))
+    
+    def _initial_drift(self, execution_id: str, drift: float) -> float:
+        """Get an execution's starting drift, recording it on the first poll."""
+        initial_drift = self._initial_drifts.get(execution_id)
+        if initial_drift is None:
+            initial_drift = self._initial_drifts[execution_id] = drift
+        self._initial_drifts.move_to_end(execution_id)
+        
+        while len(self._initial_drifts) > self.TRACKED_EXECUTIONS:
+            self._initial_drifts.popitem(last=False)
+        
+        return initial_drift
\ No newline at end of file
@@ -1,11 +1,12 @@
 """Swap execution agent."""
 
-import json
 from typing import Dict, Any, Optional, List, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+import numpy as np
 from langchain_core.tools import Tool
 
-from app.agents.base import BaseAgent
+from app.agents.base import BaseAgent, dumps_json, get_chain_name
 from app.agents.config import AgentType, agent_config_manager
 from app.services.performance_logger import performance_logger
 
@@ -13,6 +14,126 @@ from app.services.performance_logger import performance_logger
 class SwapAgent(BaseAgent):
     """Agent specialized in token swaps and DEX operations."""
     
+    # Prompt templates. Static instructions come first so requests share an
+    # identical prefix for provider prompt caching; request data goes last.
+    _ROUTE_PROMPT = """Analyze the best route for the swap below.
+
+Consider:
+1. Direct pairs vs multi-hop routes
+2. Liquidity depth on different DEXs
+3. Gas costs for different routes
+4. Historical slippage data
+5. MEV protection needs
+
+Provide detailed route analysis and recommendations.
+
+Swap:
+- From: {amount} {from_token}
+- To: {to_token}
+- Chain: {chain}"""
+    
+    _DEX_COMPARISON_PROMPT = """Compare swap quotes across DEXs for the swap below.
+
+For each DEX, analyze:
+1. Exchange rate
+2. Price impact
+3. Gas costs
+4. Liquidity available
+5. Total cost (including fees)
+
+Provide a comparison table and recommendation for the best option.
+
+- Swap: {amount} {from_token} → {to_token}
+- DEXs to compare: {dexs}"""
+    
+    _COMPUTED_IMPACT_PROMPT = """Explain the computed price impact below for a swap on a constant-product pool.
+
+For each amount, assess:
+1. Whether to split the trade
+2. Recommended execution strategy
+
+Use the computed figures as given.
+
+Swap: {from_token} → {to_token}
+Pool fee: {fee_percent:g}%
+
+{table}"""
+    
+    _PRICE_IMPACT_PROMPT = """Calculate price impact for the swap below at each amount.
+
+For each amount, estimate:
+1. Expected exchange rate
+2. Price impact percentage
+3. Effective slippage
+4. Whether to split the trade
+5. Recommended execution strategy
+
+Consider current market liquidity and typical trading patterns.
+
+Swap: {from_token} → {to_token}
+Amounts to analyze: {amounts}"""
+    
+    _TIMING_PROMPT = """Suggest optimal timing for executing the swap below.
+
+Consider:
+1. Gas price patterns (time of day/week)
+2. Market volatility windows
+3. Liquidity variations
+4. MEV risk periods
+5. Historical best execution times
+
+Provide specific recommendations with rationale.
+
+Swap: {amount} {from_token} → {to_token}
+Time preference: {time_preference}"""
+    
+    _FEES_PROMPT = """Explain the fees for the swap below.
+
+Break down:
+1. DEX trading fees (LP fees)
+2. Protocol fees (if any)
+3. Gas costs (in USD)
+4. Price impact costs
+5. MEV protection costs (if applicable)
+6. Total all-in cost
+
+Explain each component clearly and show total cost calculation.
+
+Detail Level: {breakdown_detail}
+
+Swap Data:
+{swap_data}"""
+    
+    _SAFETY_PROMPT = """Analyze the safety of the token below for swapping.
+
+Check for:
+1. Known scam patterns
+2. Honeypot characteristics
+3. Unusual token mechanics
+4. Liquidity concerns
+5. Contract verification status
+
+Provide a safety score (0-10) and detailed warnings if any.
+
+Token Address: {token_address}
+Chain: {chain}"""
+    
+    _GAS_PROMPT = """Optimize gas usage for the swap below.
+
+Provide optimization strategies:
+1. Best time to execute
+2. Whether to use flashloan
+3. Batching opportunities
+4. Gas token usage
+5. Transaction settings (gas limit, priority fee)
+
+Calculate potential savings for each strategy.
+
+Current Gas Price: {gas_price_gwei} gwei
+
+Swap Parameters:
+{swap_params}"""
+    
     # Common DEX names for reference
     SUPPORTED_DEXS = [
         "Uniswap", "SushiSwap", "Curve", "Balancer",
@@ -84,7 +205,8 @@ class SwapAgent(BaseAgent):
                 if self.tools:
                     response, tool_calls = await self.invoke_with_tools(
                         enhanced_query,
-                        context=context
+                        context=context,
+                        execute_tools=True
                     )
                     metrics.metadata["tools_used"] = len(tool_calls)
                     metrics.metadata["has_quote"] = True
@@ -93,7 +215,7 @@ class SwapAgent(BaseAgent):
                     metrics.metadata["tools_used"] = 0
                     metrics.metadata["has_quote"] = False
                 
-                return response.content if hasattr(response, 'content') else str(response)
+                return self._response_text(response)
                 
             except Exception as e:
                 performance_logger.logger.error(
@@ -115,11 +237,38 @@ class SwapAgent(BaseAgent):
         context: Optional[Dict[str, Any]]
     ) -> str:
         """Build enhanced swap query."""
-        parts = [query]
+        parts = [
+            query,
+            self._swap_details(
+                from_token, to_token, amount, wallet_address, slippage_tolerance
+            )
+        ]
+        
+        if context:
+            if "gas_price" in context:
+                parts.append(f"- Current Gas Price: {context['gas_price']} gwei")
+            if "urgency" in context:
+                parts.append(f"- Urgency: {context['urgency']}")
         
-        parts.append(f"\nSwap Details:")
-        parts.append(f"- From: {from_token}")
-        parts.append(f"- To: {to_token}")
+        parts.append("\nPlease provide quote details including rates, fees, and recommendations.")
+        
+        return "\n".join(parts)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _swap_details(
+        from_token: str,
+        to_token: str,
+        amount: Optional[float],
+        wallet_address: Optional[str],
+        slippage_tolerance: float
+    ) -> str:
+        """Build the swap details section of a swap query."""
+        parts = [
+            "\nSwap Details:",
+            f"- From: {from_token}",
+            f"- To: {to_token}"
+        ]
         
         if amount:
             parts.append(f"- Amount: {amount} {from_token}")
@@ -129,14 +278,6 @@ class SwapAgent(BaseAgent):
         
         parts.append(f"- Max Slippage: {slippage_tolerance}%")
         
-        if context:
-            if "gas_price" in context:
-                parts.append(f"- Current Gas Price: {context['gas_price']} gwei")
-            if "urgency" in context:
-                parts.append(f"- Urgency: {context['urgency']}")
-        
-        parts.append("\nPlease provide quote details including rates, fees, and recommendations.")
-        
         return "\n".join(parts)
     
     async def analyze_swap_route(
@@ -158,19 +299,12 @@ class SwapAgent(BaseAgent):
         Returns:
             Route analysis
         """
-        prompt = f"""Analyze the best swap route for:
-- From: {amount} {from_token}
-- To: {to_token}
-- Chain: {self._get_chain_name(chain_id)}
-
-Consider:
-1. Direct pairs vs multi-hop routes
-2. Liquidity depth on different DEXs
-3. Gas costs for different routes
-4. Historical slippage data
-5. MEV protection needs
-
-Provide detailed route analysis and recommendations."""
+        prompt = self._ROUTE_PROMPT.format(
+            amount=amount,
+            from_token=from_token,
+            to_token=to_token,
+            chain=get_chain_name(chain_id)
+        )
         
         response = await self.invoke(prompt)
         
@@ -180,20 +314,12 @@ Provide detailed route analysis and recommendations."""
             "to_token": to_token,
             "amount": amount,
             "chain_id": chain_id,
-            "analysis": response.content if hasattr(response, 'content') else str(response),
-            "timestamp": datetime.utcnow().isoformat()
+            "analysis": self._response_text(response),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds")
         }
         
         return analysis
     
-    def _get_chain_name(self, chain_id: int) -> str:
-        """Get chain name from ID."""
-        chains = {
-            1: "Ethereum", 137: "Polygon", 10: "Optimism",
-            42161: "Arbitrum", 56: "BSC", 43114: "Avalanche"
-        }
-        return chains.get(chain_id, f"Chain {chain_id}")
-    
     async def compare_dex_quotes(
         self,
         from_token: str,
@@ -216,54 +342,116 @@ Provide detailed route analysis and recommendations."""
         if not dexs_to_compare:
             dexs_to_compare = ["Uniswap", "SushiSwap", "Curve", "1inch"]
         
-        prompt = f"""Compare swap quotes across DEXs for:
-- Swap: {amount} {from_token} → {to_token}
-- DEXs to compare: {', '.join(dexs_to_compare)}
-
-For each DEX, analyze:
-1. Exchange rate
-2. Price impact
-3. Gas costs
-4. Liquidity available
-5. Total cost (including fees)
-
-Provide a comparison table and recommendation for the best option."""
+        prompt = self._DEX_COMPARISON_PROMPT.format(
+            amount=amount,
+            from_token=from_token,
+            to_token=to_token,
+            dexs=", ".join(dexs_to_compare)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def calculate_price_impact(
         self,
         from_token: str,
         to_token: str,
-        amounts: List[float]
+        amounts: List[float],
+        *,
+        reserves: Optional[Tuple[float, float]] = None,
+        fee_bps: int = 30,
+        numeric_only: bool = False
     ) -> str:
         """
         Calculate price impact for different swap amounts.
         
+        When pool reserves are known the impact is computed exactly with the
+        constant-product formula, and the model only interprets the resulting
+        table. Without reserves the model has to estimate it.
+        
         Args:
             from_token: Source token
             to_token: Destination token
             amounts: List of amounts to analyze
+            reserves: Optional (from_token, to_token) pool reserves
+            fee_bps: Pool fee in basis points
+            numeric_only: Return the computed table without model commentary
+                (requires reserves)
             
         Returns:
             Price impact analysis
+            
+        Raises:
+            ValueError: If numeric_only is set without reserves, a reserve is
+                not positive, or an amount is negative
         """
-        prompt = f"""Calculate price impact for swapping {from_token} to {to_token}:
-
-Amounts to analyze: {amounts}
-
-For each amount, estimate:
-1. Expected exchange rate
-2. Price impact percentage
-3. Effective slippage
-4. Whether to split the trade
-5. Recommended execution strategy
-
-Consider current market liquidity and typical trading patterns."""
+        if numeric_only and reserves is None:
+            raise ValueError("numeric_only requires pool reserves")
+        
+        if reserves is not None:
+            if min(reserves) <= 0:
+                raise ValueError("Pool reserves must be positive")
+            if any(amount < 0 for amount in amounts):
+                raise ValueError("Swap amounts must not be negative")
+            
+            outputs, impact_bps = self._price_impact_curve(
+                np.asarray(amounts, dtype=np.float64), *reserves, fee_bps
+            )
+            table = "\n".join(
+                [f"| Amount ({from_token}) | Output ({to_token}) | Price impact |",
+                 "|---|---|---|"]
+                + [
+                    f"| {amount:g} | {output:.6g} | {impact / 100:.2f}% |"
+                    for amount, output, impact in zip(amounts, outputs, impact_bps, strict=True)
+                ]
+            )
+            if numeric_only:
+                return table
+            
+            prompt = self._COMPUTED_IMPACT_PROMPT.format(
+                from_token=from_token,
+                to_token=to_token,
+                fee_percent=fee_bps / 100,
+                table=table
+            )
+            response = await self.invoke(prompt)
+            return self._response_text(response)
+        
+        prompt = self._PRICE_IMPACT_PROMPT.format(
+            from_token=from_token,
+            to_token=to_token,
+            amounts=amounts
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
+    
+    @staticmethod
+    def _price_impact_curve(
+        amounts: np.ndarray,
+        reserve_in: float,
+        reserve_out: float,
+        fee_bps: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute constant-product (x * y = k) swap outputs and price impact.
+        
+        Args:
+            amounts: Input amounts
+            reserve_in: Pool reserve of the input token
+            reserve_out: Pool reserve of the output token
+            fee_bps: Pool fee in basis points
+            
+        Returns:
+            Tuple of (output amounts, price impact in basis points)
+        """
+        amounts_after_fee = amounts * (1 - fee_bps / 10_000)
+        outputs = reserve_out * amounts_after_fee / (reserve_in + amounts_after_fee)
+        
+        # Execution price relative to the spot price reserve_out / reserve_in,
+        # excluding the fee itself
+        impact_bps = amounts_after_fee / (reserve_in + amounts_after_fee) * 10_000
+        return outputs, impact_bps
     
     async def suggest_swap_timing(
         self,
@@ -284,21 +472,15 @@ Consider current market liquidity and typical trading patterns."""
         Returns:
             Timing suggestions
         """
-        prompt = f"""Suggest optimal timing for swapping {amount} {from_token} to {to_token}:
-
-Time preference: {time_preference}
-
-Consider:
-1. Gas price patterns (time of day/week)
-2. Market volatility windows
-3. Liquidity variations
-4. MEV risk periods
-5. Historical best execution times
-
-Provide specific recommendations with rationale."""
+        prompt = self._TIMING_PROMPT.format(
+            amount=amount,
+            from_token=from_token,
+            to_token=to_token,
+            time_preference=time_preference
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def explain_swap_fees(
         self,
@@ -315,25 +497,13 @@ Provide specific recommendations with rationale."""
         Returns:
             Fee explanation
         """
-        prompt = f"""Explain the fees for this swap:
-
-Swap Data:
-{json.dumps(swap_data, indent=2)}
-
-Detail Level: {breakdown_detail}
-
-Break down:
-1. DEX trading fees (LP fees)
-2. Protocol fees (if any)
-3. Gas costs (in USD)
-4. Price impact costs
-5. MEV protection costs (if applicable)
-6. Total all-in cost
-
-Explain each component clearly and show total cost calculation."""
+        prompt = self._FEES_PROMPT.format(
+            breakdown_detail=breakdown_detail,
+            swap_data=dumps_json(swap_data, indent=True)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
+        return self._response_text(response)
     
     async def check_token_safety(
         self,
@@ -350,19 +520,10 @@ Explain each component clearly and show total cost calculation."""
         Returns:
             Safety analysis
         """
-        prompt = f"""Analyze the safety of this token for swapping:
-
-Token Address: {token_address}
-Chain: {self._get_chain_name(chain_id)}
-
-Check for:
-1. Known scam patterns
-2. Honeypot characteristics
-3. Unusual token mechanics
-4. Liquidity concerns
-5. Contract verification status
-
-Provide a safety score (0-10) and detailed warnings if any."""
+        prompt = self._SAFETY_PROMPT.format(
+            token_address=token_address,
+            chain=get_chain_name(chain_id)
+        )
         
         response = await self.invoke(prompt)
         
@@ -370,8 +531,8 @@ Provide a safety score (0-10) and detailed warnings if any."""
         return {
             "token_address": token_address,
             "chain_id": chain_id,
-            "safety_analysis": response.content if hasattr(response, 'content') else str(response),
-            "checked_at": datetime.utcnow().isoformat()
+            "safety_analysis": self._response_text(response),
+            "checked_at": datetime.now(timezone.utc).isoformat(timespec="seconds")
         }
     
     async def optimize_gas_for_swap(
@@ -389,21 +550,10 @@ Provide a safety score (0-10) and detailed warnings if any."""
         Returns:
             Gas optimization suggestions
         """
-        prompt = f"""Optimize gas usage for this swap:
-
-Swap Parameters:
-{json.dumps(swap_params, indent=2)}
-
-Current Gas Price: {gas_price_gwei} gwei
-
-Provide optimization strategies:
-1. Best time to execute
-2. Whether to use flashloan
-3. Batching opportunities
-4. Gas token usage
-5. Transaction settings (gas limit, priority fee)
-
-Calculate potential savings for each strategy."""
+        prompt = self._GAS_PROMPT.format(
+            gas_price_gwei=gas_price_gwei,
+            swap_params=dumps_json(swap_params, indent=True)
+        )
         
         response = await self.invoke(prompt)
-        return response.content if hasattr(response, 'content') else str(response)
\ No newline at end of file
+        return self._response_text(response)
\ No newline at end of file
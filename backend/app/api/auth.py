@@ -1,17 +1,17 @@
+import asyncio
 from datetime import timedelta
-from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends, Request, Response
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
 from app.core.auth import (
     verify_siwe_signature,
     create_access_token,
-    verify_token,
+    get_current_user,
     generate_nonce,
     validate_ethereum_address,
     rate_limiter,
+    nonce_store,
     TokenData
 )
 from app.core.admin import admin_access_control, get_admin_status
@@ -19,7 +19,15 @@ from app.core.config import settings
 
 
 router = APIRouter()
-security = HTTPBearer()
+
+# Token lifetime and cookie settings are fixed for the process
+_ACCESS_TOKEN_EXPIRES = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+_COOKIE_KWARGS = {
+    "httponly": True,
+    "secure": True,  # Set to True in production with HTTPS
+    "samesite": "lax",
+    "max_age": settings.JWT_EXPIRATION_HOURS * 3600,
+}
 
 
 class NonceRequest(BaseModel):
@@ -52,33 +60,6 @@ class UserResponse(BaseModel):
     authenticated: bool = True
 
 
-# In-memory nonce storage (in production, use Redis or database)
-nonce_storage: dict[str, str] = {}
-
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[TokenData]:
-    """
-    Dependency to get current authenticated user from JWT token.
-    
-    Args:
-        credentials: HTTP Bearer token credentials
-        
-    Returns:
-        TokenData if authenticated, raises HTTPException otherwise
-    """
-    token = credentials.credentials
-    token_data = verify_token(token)
-    
-    if token_data is None:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return token_data
-
-
 @router.post("/nonce", response_model=NonceResponse)
 async def generate_nonce_endpoint(request: NonceRequest):
     """
@@ -94,8 +75,10 @@ async def generate_nonce_endpoint(request: NonceRequest):
     if not validate_ethereum_address(request.address):
         raise HTTPException(status_code=400, detail="Invalid Ethereum address")
     
+    addr = request.address.lower()
+    
     # Check rate limit
-    if not rate_limiter.check_rate_limit(request.address.lower()):
+    if not rate_limiter.check_rate_limit(addr):
         raise HTTPException(
             status_code=429,
             detail="Rate limit exceeded. Please try again later."
@@ -103,7 +86,7 @@ async def generate_nonce_endpoint(request: NonceRequest):
     
     # Generate and store nonce
     nonce = generate_nonce()
-    nonce_storage[request.address.lower()] = nonce
+    nonce_store.set(addr, nonce)
     
     return NonceResponse(nonce=nonce)
 
@@ -124,15 +107,18 @@ async def login(request: LoginRequest, response: Response):
     if not validate_ethereum_address(request.address):
         raise HTTPException(status_code=400, detail="Invalid Ethereum address")
     
+    addr = request.address.lower()
+    
     # Check rate limit
-    if not rate_limiter.check_rate_limit(request.address.lower()):
+    if not rate_limiter.check_rate_limit(addr):
         raise HTTPException(
             status_code=429,
             detail="Rate limit exceeded. Please try again later."
         )
     
-    # Verify signature
-    if not verify_siwe_signature(
+    # Verify signature (ecrecover is CPU-bound; keep it off the event loop)
+    if not await asyncio.to_thread(
+        verify_siwe_signature,
         message=request.message,
         signature=request.signature,
         expected_address=request.address
@@ -140,28 +126,20 @@ async def login(request: LoginRequest, response: Response):
         raise HTTPException(status_code=401, detail="Invalid signature")
     
     # Create access token
-    access_token_expires = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     access_token = create_access_token(
-        data={"address": request.address.lower()},
-        expires_delta=access_token_expires
+        data={"address": addr},
+        expires_delta=_ACCESS_TOKEN_EXPIRES
     )
     
     # Set HTTP-only cookie (optional, frontend can also handle token)
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=True,  # Set to True in production with HTTPS
-        samesite="lax",
-        max_age=settings.JWT_EXPIRATION_HOURS * 3600
-    )
+    response.set_cookie(key="access_token", value=access_token, **_COOKIE_KWARGS)
     
     # Clear nonce after successful login
-    nonce_storage.pop(request.address.lower(), None)
+    nonce_store.pop(addr)
     
     return LoginResponse(
         access_token=access_token,
-        address=request.address.lower()
+        address=addr
     )
 
 
@@ -211,21 +189,13 @@ async def refresh_token(
         New JWT access token
     """
     # Create new access token
-    access_token_expires = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     access_token = create_access_token(
         data={"address": current_user.address},
-        expires_delta=access_token_expires
+        expires_delta=_ACCESS_TOKEN_EXPIRES
     )
     
     # Update cookie
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=True,  # Set to True in production with HTTPS
-        samesite="lax",
-        max_age=settings.JWT_EXPIRATION_HOURS * 3600
-    )
+    response.set_cookie(key="access_token", value=access_token, **_COOKIE_KWARGS)
     
     return LoginResponse(
         access_token=access_token,
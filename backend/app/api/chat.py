@@ -1,13 +1,17 @@
 """WebSocket chat handler with LangGraph integration."""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from typing import Dict, List, Optional, Any
-import json
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple, Union
 import asyncio
+import itertools
+import time
 import uuid
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pydantic import BaseModel, ValidationError
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
+from app.agents.base import dumps_json
 from app.core.auth import get_current_user_ws, get_current_user, TokenData
 from app.workflows import get_chat_workflow, ChatState
 from app.services.performance_logger import performance_logger
@@ -19,13 +23,154 @@ router = APIRouter()
 # Store active connections
 active_connections: Dict[str, WebSocket] = {}
 
-# Store user sessions
-user_sessions: Dict[str, str] = {}  # user_id -> session_id
+# Store user sessions (user_id -> session_id), least recently used first
+MAX_USER_SESSIONS = 10_000
+user_sessions: "OrderedDict[str, str]" = OrderedDict()
+
+
+def get_or_create_session(address: str) -> str:
+    """
+    Get the chat session ID for a user, creating one if needed.
+    
+    The mapping is bounded; the least recently used users are forgotten
+    first and get a new session on their next message.
+    
+    Args:
+        address: User's wallet address
+        
+    Returns:
+        Session ID
+    """
+    session_id = user_sessions.get(address)
+    if session_id is not None:
+        user_sessions.move_to_end(address)
+        return session_id
+    
+    session_id = f"session_{address}_{uuid.uuid4().hex[:8]}"
+    user_sessions[address] = session_id
+    if len(user_sessions) > MAX_USER_SESSIONS:
+        user_sessions.popitem(last=False)
+    return session_id
+
+
+# In-flight REST chat requests, keyed by (session_id, content)
+_inflight_messages: Dict[Tuple[str, str], "asyncio.Future[Dict[str, Any]]"] = {}
+
+
+async def invoke_shared(
+    chat_workflow: Any,
+    session_id: str,
+    content: str,
+    metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Run the chat workflow, sharing the run with identical in-flight requests.
+    
+    A retried or double-submitted message for the same session waits on the
+    run already in progress instead of calling the LLM again and adding the
+    message to the session memory twice.
+    
+    Args:
+        chat_workflow: Chat workflow instance
+        session_id: Session ID
+        content: User message content
+        metadata: Request metadata
+        
+    Returns:
+        Final workflow state
+    """
+    key = (session_id, content)
+    run = _inflight_messages.get(key)
+    if run is None:
+        run = asyncio.ensure_future(chat_workflow.invoke(
+            messages=[HumanMessage(content=content)],
+            session_id=session_id,
+            metadata=metadata
+        ))
+        _inflight_messages[key] = run
+        run.add_done_callback(lambda _: _inflight_messages.pop(key, None))
+    
+    # A cancelled request must not cancel the run for the others
+    return await asyncio.shield(run)
+
+
+# Message types that are transient status events and carry no ID
+TRANSIENT_MESSAGE_TYPES = frozenset({"typing", "routing"})
+
+# History entry type for each stored message class
+HISTORY_MESSAGE_TYPES = {
+    HumanMessage: "human",
+    AIMessage: "ai",
+    SystemMessage: "system",
+}
+
+
+def history_message_type(msg: Any) -> Optional[str]:
+    """
+    Get the history entry type for a stored message.
+    
+    Subclasses (e.g. AIMessageChunk) map to their base message type.
+    
+    Args:
+        msg: Stored message
+        
+    Returns:
+        History entry type, or None if the message isn't part of history
+    """
+    for cls in type(msg).__mro__:
+        msg_type = HISTORY_MESSAGE_TYPES.get(cls)
+        if msg_type is not None:
+            return msg_type
+    return None
+
+# Outgoing message IDs only need to be unique within the process
+_message_ids = itertools.count(1)
+
+# Timestamp string shared by messages created within the same second
+_timestamp_cache: Tuple[int, str] = (0, "")
+
+
+def utc_timestamp() -> str:
+    """
+    Get the current UTC time as an ISO string with second precision.
+    
+    Returns:
+        ISO formatted timestamp, formatted at most once per second
+    """
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+    return _timestamp_cache[1]
+
+
+class InboundChatMessage(BaseModel):
+    """Message received from a WebSocket client."""
+    content: str
+    stream: bool = True
+    metadata: Dict[str, Any] = {}
+
+
+class HistoryEntry(BaseModel):
+    """Stored chat message in a session history."""
+    type: str
+    content: Union[str, List[Any]]
+    metadata: Dict[str, Any] = {}
+
+
+class ChatHistoryResponse(BaseModel):
+    """Response model for a session's chat history."""
+    session_id: str
+    messages: List[HistoryEntry]
+    metrics: Dict[str, Any]
 
 
 class ChatMessage:
     """Chat message structure."""
     
+    # One instance per streamed event; avoid a per-instance __dict__
+    __slots__ = ("type", "content", "metadata", "timestamp", "id")
+    
     def __init__(
         self,
         type: str,
@@ -35,18 +180,133 @@ class ChatMessage:
         self.type = type
         self.content = content
         self.metadata = metadata or {}
-        self.timestamp = datetime.utcnow().isoformat()
-        self.id = str(uuid.uuid4())
+        self.timestamp = utc_timestamp()
+        self.id = None if type in TRANSIENT_MESSAGE_TYPES else format(next(_message_ids), "x")
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return {
-            "id": self.id,
+        data = {
             "type": self.type,
             "content": self.content,
             "metadata": self.metadata,
             "timestamp": self.timestamp
         }
+        if self.id is not None:
+            data["id"] = self.id
+        return data
+
+
+async def send_message(websocket: WebSocket, message: ChatMessage) -> None:
+    """
+    Send a message as a JSON text frame.
+    
+    Args:
+        websocket: Client connection
+        message: Message to send
+    """
+    await websocket.send_text(dumps_json(message.to_dict()))
+
+
+async def send_batch(websocket: WebSocket, messages: List[ChatMessage]) -> None:
+    """
+    Send messages produced together as a single WebSocket frame.
+    
+    A lone message is sent as a plain object; several are sent as a JSON
+    array, which clients unpack in order.
+    
+    Args:
+        websocket: Client connection
+        messages: Messages to send
+    """
+    if not messages:
+        return
+    if len(messages) == 1:
+        await send_message(websocket, messages[0])
+    else:
+        await websocket.send_text(
+            dumps_json([message.to_dict() for message in messages])
+        )
+
+
+def workflow_event_messages(event: Dict[str, Any]) -> List[ChatMessage]:
+    """
+    Convert one workflow stream event into chat messages.
+    
+    Args:
+        event: Node outputs keyed by node name
+        
+    Returns:
+        Messages to send for the event
+    """
+    messages: List[ChatMessage] = []
+    
+    for node_name, node_output in event.items():
+        if node_name == "route_query":
+            # Routing info
+            messages.append(ChatMessage(
+                type="routing",
+                content="",
+                metadata={
+                    "selected_agent": node_output.get("current_agent"),
+                    "confidence": node_output.get("routing_result", {}).get("confidence")
+                }
+            ))
+        
+        elif node_name.endswith("_agent"):
+            # Extract agent response
+            if "messages" in node_output and node_output["messages"]:
+                last_msg = node_output["messages"][-1]
+                if isinstance(last_msg, AIMessage):
+                    # Get metadata from additional_kwargs or use defaults
+                    msg_metadata = getattr(last_msg, 'additional_kwargs', {})
+                    messages.append(ChatMessage(
+                        type="ai_response",
+                        content=last_msg.content,
+                        metadata={
+                            "agent": msg_metadata.get("agent", "AI"),
+                            "agent_type": msg_metadata.get("agent_type")
+                        }
+                    ))
+    
+    return messages
+
+
+async def stream_workflow_messages(
+    websocket: WebSocket,
+    events: AsyncIterator[Dict[str, Any]]
+) -> None:
+    """
+    Relay workflow stream events to a client.
+    
+    The workflow runs in its own task and queues each step's messages, so it
+    keeps executing while earlier frames are being sent. Messages from one
+    step go out in a single frame. Workflow errors are raised once the
+    messages produced before them have been sent.
+    
+    Args:
+        websocket: Client connection
+        events: Workflow stream events
+    """
+    queue: asyncio.Queue[Optional[List[ChatMessage]]] = asyncio.Queue()
+    
+    async def produce() -> None:
+        try:
+            async for event in events:
+                batch = workflow_event_messages(event)
+                if batch:
+                    queue.put_nowait(batch)
+        finally:
+            queue.put_nowait(None)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while (batch := await queue.get()) is not None:
+            await send_batch(websocket, batch)
+        await producer
+    finally:
+        # Stop the workflow if the client went away mid-stream
+        if not producer.done():
+            producer.cancel()
 
 
 @router.websocket("/ws/{client_id}")
@@ -62,10 +322,7 @@ async def websocket_endpoint(
     # Get or create session ID for user
     if user:
         # Authenticated user - use their address for session
-        session_id = user_sessions.get(user.address)
-        if not session_id:
-            session_id = f"session_{user.address}_{uuid.uuid4().hex[:8]}"
-            user_sessions[user.address] = session_id
+        session_id = get_or_create_session(user.address)
     else:
         # Unauthenticated user - use client_id as session
         session_id = f"session_anon_{client_id}"
@@ -85,26 +342,30 @@ async def websocket_endpoint(
             content="Connected to OptimizeDeFi AI assistant. How can I help you today?",
             metadata={"agent": "system"}
         )
-        await websocket.send_json(welcome_msg.to_dict())
+        await send_message(websocket, welcome_msg)
         
         while True:
             # Receive message from client
             data = await websocket.receive_text()
             
             try:
-                message_data = json.loads(data)
-                
-                # Validate message
-                if "content" not in message_data:
-                    error_msg = ChatMessage(
-                        type="error",
-                        content="Invalid message format: missing content"
-                    )
-                    await websocket.send_json(error_msg.to_dict())
+                # Parse and validate in one pass
+                try:
+                    message_data = InboundChatMessage.model_validate_json(data)
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    if error["type"] == "json_invalid":
+                        content = "Invalid JSON message"
+                    elif error["type"] == "missing":
+                        content = f"Invalid message format: missing {error['loc'][0]}"
+                    else:
+                        content = f"Invalid message format: {error['msg']}"
+                    error_msg = ChatMessage(type="error", content=content)
+                    await send_message(websocket, error_msg)
                     continue
                 
                 # Create user message
-                user_content = message_data["content"]
+                user_content = message_data.content
                 user_msg = HumanMessage(
                     content=user_content,
                     metadata={
@@ -120,21 +381,13 @@ async def websocket_endpoint(
                     session_id=session_id,
                     message_length=len(user_content)
                 ) as metrics:
-                    # Send typing indicator
-                    typing_msg = ChatMessage(
-                        type="typing",
-                        content="",
-                        metadata={"agent": "thinking"}
-                    )
-                    await websocket.send_json(typing_msg.to_dict())
-                    
                     # Process with workflow
                     try:
                         # Add metadata
                         metadata = {
                             "client_id": client_id,
                             "user_address": user.address if user else None,
-                            "request_metadata": message_data.get("metadata", {})
+                            "request_metadata": message_data.metadata
                         }
                         
                         # Get workflow instance
@@ -146,57 +399,32 @@ async def websocket_endpoint(
                                 content="Chat service is temporarily unavailable. Please ensure API keys are configured.",
                                 metadata={"error_type": "service_unavailable"}
                             )
-                            await websocket.send_json(error_msg.to_dict())
+                            await send_message(websocket, error_msg)
                             continue
                         
                         # Check if streaming is requested
-                        stream_response = message_data.get("stream", True)
+                        stream_response = message_data.stream
                         
                         if stream_response and chat_workflow.config.enable_streaming:
                             # Stream response
-                            agent_name = None
-                            response_content = ""
-                            
-                            async for event in chat_workflow.stream(
-                                messages=[user_msg],  # Just current message
-                                session_id=session_id,
-                                metadata=metadata
-                            ):
-                                # Process streaming events
-                                for node_name, node_output in event.items():
-                                    if node_name == "route_query":
-                                        # Send routing info
-                                        routing_msg = ChatMessage(
-                                            type="routing",
-                                            content="",
-                                            metadata={
-                                                "selected_agent": node_output.get("current_agent"),
-                                                "confidence": node_output.get("routing_result", {}).get("confidence")
-                                            }
-                                        )
-                                        await websocket.send_json(routing_msg.to_dict())
-                                    
-                                    elif node_name.endswith("_agent"):
-                                        # Extract agent response
-                                        if "messages" in node_output and node_output["messages"]:
-                                            last_msg = node_output["messages"][-1]
-                                            if isinstance(last_msg, AIMessage):
-                                                # Get metadata from additional_kwargs or use defaults
-                                                msg_metadata = getattr(last_msg, 'additional_kwargs', {})
-                                                agent_name = msg_metadata.get("agent", "AI")
-                                                response_content = last_msg.content
-                                                
-                                                # Send response
-                                                response_msg = ChatMessage(
-                                                    type="ai_response",
-                                                    content=response_content,
-                                                    metadata={
-                                                        "agent": agent_name,
-                                                        "agent_type": msg_metadata.get("agent_type")
-                                                    }
-                                                )
-                                                await websocket.send_json(response_msg.to_dict())
+                            await stream_workflow_messages(
+                                websocket,
+                                chat_workflow.stream(
+                                    messages=[user_msg],  # Just current message
+                                    session_id=session_id,
+                                    metadata=metadata
+                                )
+                            )
                         else:
+                            # Send typing indicator; streamed turns use the
+                            # first routing event instead
+                            typing_msg = ChatMessage(
+                                type="typing",
+                                content="",
+                                metadata={"agent": "thinking"}
+                            )
+                            await send_message(websocket, typing_msg)
+                            
                             # Non-streaming response
                             final_state = await chat_workflow.invoke(
                                 messages=[user_msg],  # Just current message
@@ -219,7 +447,7 @@ async def websocket_endpoint(
                                             "routing": final_state.get("routing_result")
                                         }
                                     )
-                                    await websocket.send_json(response_msg.to_dict())
+                                    await send_message(websocket, response_msg)
                         
                         # Record metrics
                         metrics.metadata["response_generated"] = True
@@ -232,7 +460,7 @@ async def websocket_endpoint(
                             content=f"I encountered an error processing your request: {str(e)}",
                             metadata={"error_type": type(e).__name__}
                         )
-                        await websocket.send_json(error_msg.to_dict())
+                        await send_message(websocket, error_msg)
                         
                         # Log error
                         performance_logger.logger.error(
@@ -244,13 +472,6 @@ async def websocket_endpoint(
                         
                         metrics.metadata["error"] = str(e)
                 
-            except json.JSONDecodeError:
-                error_msg = ChatMessage(
-                    type="error",
-                    content="Invalid JSON message"
-                )
-                await websocket.send_json(error_msg.to_dict())
-            
             except Exception as e:
                 performance_logger.logger.error(
                     "websocket_message_error",
@@ -290,13 +511,7 @@ async def send_chat_message(
             raise HTTPException(status_code=400, detail="Missing message content")
         
         # Get or create session
-        session_id = user_sessions.get(current_user.address)
-        if not session_id:
-            session_id = f"session_{current_user.address}_{uuid.uuid4().hex[:8]}"
-            user_sessions[current_user.address] = session_id
-        
-        # Create messages
-        messages = [HumanMessage(content=message["content"])]
+        session_id = get_or_create_session(current_user.address)
         
         # Process with workflow
         metadata = {
@@ -313,10 +528,11 @@ async def send_chat_message(
             )
         
         # Invoke workflow (non-streaming for REST)
-        final_state = await chat_workflow.invoke(
-            messages=messages,
-            session_id=session_id,
-            metadata=metadata
+        final_state = await invoke_shared(
+            chat_workflow,
+            session_id,
+            message["content"],
+            metadata
         )
         
         # Extract response
@@ -360,7 +576,7 @@ async def send_chat_message(
         )
 
 
-@router.get("/sessions/{session_id}/history")
+@router.get("/sessions/{session_id}/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: str,
     current_user: TokenData = Depends(get_current_user),
@@ -376,26 +592,15 @@ async def get_chat_history(
     messages = await memory_manager.get_messages_for_context(session_id)
     
     # Convert to serializable format
-    history = []
-    for msg in messages[-limit:]:  # Limit results
-        if isinstance(msg, HumanMessage):
-            history.append({
-                "type": "human",
-                "content": msg.content,
-                "metadata": msg.metadata if hasattr(msg, "metadata") else {}
-            })
-        elif isinstance(msg, AIMessage):
-            history.append({
-                "type": "ai",
-                "content": msg.content,
-                "metadata": msg.metadata if hasattr(msg, "metadata") else {}
-            })
-        elif isinstance(msg, SystemMessage):
-            history.append({
-                "type": "system",
-                "content": msg.content,
-                "metadata": msg.metadata if hasattr(msg, "metadata") else {}
-            })
+    history = [
+        {
+            "type": msg_type,
+            "content": msg.content,
+            "metadata": getattr(msg, "metadata", {})
+        }
+        for msg in messages[-limit:]  # Limit results
+        if (msg_type := history_message_type(msg)) is not None
+    ]
     
     # Get session metrics
     metrics = await memory_manager.get_session_metrics(session_id)
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
 from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
 import aiohttp
 
 from app.core.config import settings
 
 router = APIRouter()
 
+# Detailed health results are reused for a short window so frequent probes
+# don't each call out to external services
+HEALTH_CACHE_TTL = 5.0
+_health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+_health_lock = asyncio.Lock()
+
 @router.get("/health")
 async def health_check():
     """Basic health check endpoint"""
@@ -16,8 +25,24 @@ async def health_check():
     }
 
 @router.get("/health/detailed")
-async def detailed_health_check():
+async def detailed_health_check(request: Request):
     """Detailed health check including external services"""
+    global _health_cache
+    
+    if _health_cache and time.monotonic() - _health_cache[0] < HEALTH_CACHE_TTL:
+        return _health_cache[1]
+    
+    # Single-flight: concurrent probes wait for one upstream check
+    async with _health_lock:
+        if _health_cache and time.monotonic() - _health_cache[0] < HEALTH_CACHE_TTL:
+            return _health_cache[1]
+        
+        health_status = await _check_services(request.app.state.http)
+        _health_cache = (time.monotonic(), health_status)
+        return health_status
+
+async def _check_services(session: aiohttp.ClientSession) -> Dict[str, Any]:
+    """Probe external services and build the detailed health status"""
     health_status = {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -30,13 +55,12 @@ async def detailed_health_check():
     # Check 1inch API
     try:
         headers = {"Authorization": f"Bearer {settings.ONEINCH_API_KEY}"}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{settings.ONEINCH_BASE_URL}/chains",
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                health_status["checks"]["1inch_api"] = response.status == 200
+        async with session.get(
+            f"{settings.ONEINCH_BASE_URL}/chains",
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=5)
+        ) as response:
+            health_status["checks"]["1inch_api"] = response.status == 200
     except Exception as e:
         health_status["checks"]["1inch_api"] = False
         health_status["errors"] = {"1inch_api": str(e)}
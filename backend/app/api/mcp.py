@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, Optional
 
 from app.core.auth import get_current_user, TokenData
 from app.mcp.server import mcp_server
@@ -10,6 +10,9 @@ from app.mcp.server import mcp_server
 
 router = APIRouter()
 
+# Tools that default to the caller's address
+PORTFOLIO_TOOLS = frozenset({"get_portfolio", "analyze_portfolio"})
+
 
 class MCPRequest(BaseModel):
     """MCP request model."""
@@ -25,6 +28,36 @@ class MCPResponse(BaseModel):
     id: Optional[str] = None
 
 
+async def _handle_tools_list(
+    params: Dict[str, Any],
+    current_user: TokenData
+) -> Dict[str, Any]:
+    """Handle an MCP tools/list request."""
+    return {"tools": await mcp_server.list_tools()}
+
+
+async def _handle_tools_execute(
+    params: Dict[str, Any],
+    current_user: TokenData
+) -> Dict[str, Any]:
+    """Handle an MCP tools/execute request."""
+    tool_name = params.get("name")
+    arguments = params.get("arguments") or {}
+    
+    # For portfolio operations, default to user's address if not specified
+    if tool_name in PORTFOLIO_TOOLS:
+        arguments.setdefault("address", current_user.address)
+    
+    return await mcp_server.execute_tool(tool_name, arguments)
+
+
+# MCP method handlers, keyed by method name
+_HANDLERS: Dict[str, Callable[[Dict[str, Any], TokenData], Awaitable[Dict[str, Any]]]] = {
+    "tools/list": _handle_tools_list,
+    "tools/execute": _handle_tools_execute,
+}
+
+
 @router.post("/", response_model=MCPResponse)
 async def handle_mcp_request(
     request: MCPRequest,
@@ -44,16 +77,11 @@ async def handle_mcp_request(
         MCP response with result or error
     """
     try:
-        result = await mcp_server.handle_request(request.dict())
-        
-        # Add user context to certain operations
-        if request.method == "tools/execute":
-            tool_name = request.params.get("name")
-            # For portfolio operations, default to user's address if not specified
-            if tool_name in ["get_portfolio", "analyze_portfolio"]:
-                if "arguments" in request.params:
-                    if "address" not in request.params["arguments"]:
-                        request.params["arguments"]["address"] = current_user.address
+        handler = _HANDLERS.get(request.method)
+        if handler is not None:
+            result = await handler(request.params or {}, current_user)
+        else:
+            result = await mcp_server.handle_request(request.model_dump(exclude_none=True))
         
         return MCPResponse(
             result=result,
@@ -99,7 +127,7 @@ async def execute_tool(
         Tool execution result
     """
     # For portfolio tools, default to user's address if not specified
-    if tool_name in ["get_portfolio", "analyze_portfolio"] and "address" not in params:
+    if tool_name in PORTFOLIO_TOOLS and "address" not in params:
         params["address"] = current_user.address
     
     result = await mcp_server.execute_tool(tool_name, params)
@@ -1,8 +1,12 @@
 """Authentication and authorization utilities."""
 
+import asyncio
 import os
+import re
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional, Dict, Any
 
 from eth_account.messages import encode_defunct
@@ -11,8 +15,8 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 from web3 import Web3
-from fastapi import WebSocket, Query, HTTPException, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import WebSocket, Query, HTTPException, Depends, Request, Response
+from fastapi.security import HTTPBearer
 
 from app.core.config import settings
 
@@ -20,13 +24,59 @@ from app.core.config import settings
 # Password context for future use (if needed for admin accounts)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Security scheme
-security = HTTPBearer()
+
+class BearerToken(HTTPBearer):
+    """
+    HTTP Bearer scheme that resolves to the raw token string.
+    
+    Behaves like HTTPBearer (same OpenAPI scheme, 401 on missing or
+    malformed credentials) but skips building an HTTPAuthorizationCredentials
+    model on every request.
+    """
+    
+    async def __call__(self, request: Request) -> Optional[str]:
+        authorization = request.headers.get("Authorization")
+        if authorization:
+            scheme, _, token = authorization.partition(" ")
+            token = token.strip()
+            if token and scheme.lower() == "bearer":
+                return token
+        
+        if self.auto_error:
+            # Raised directly: make_not_authenticated_error only exists in
+            # recent FastAPI releases
+            raise HTTPException(
+                status_code=401,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return None
+
+
+# Security schemes (documented under the standard HTTPBearer name)
+security = BearerToken(scheme_name="HTTPBearer")
+optional_security = BearerToken(scheme_name="HTTPBearer", auto_error=False)
 
 # JWT settings
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# 20-byte hex address, optionally 0x-prefixed (as accepted by Web3.is_address)
+_ADDRESS_RE = re.compile(r"(?:0[xX])?[0-9a-fA-F]{40}")
+
+# Verified tokens are cached briefly so repeat requests skip the signature
+# check; an entry never outlives the token's own expiry
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = 60
+
+# Signed tokens are reused when the same claims are signed again within the
+# same second (JWT timestamps have one-second resolution)
+SIGNED_TOKEN_CACHE_SIZE = 1024
+
+# Tokens this close to expiry are renewed on use (see get_current_user)
+TOKEN_RENEW_WINDOW = 60
+RENEWED_TOKEN_HEADER = "X-Renewed-Token"
+
 
 class SIWEMessage(BaseModel):
     """Sign-In with Ethereum message structure."""
@@ -155,6 +205,9 @@ def verify_siwe_signature(message: str, signature: str, expected_address: str) -
         return False
 
 
+_signed_token_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -169,31 +222,74 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     
     # Set expiration
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
+    # Whole-second timestamps, exactly as the encoder would truncate them
     to_encode.update({
-        "exp": expire,
-        "iat": datetime.now(timezone.utc)
+        "exp": int(expire.timestamp()),
+        "iat": int(now.timestamp())
     })
     
-    # Create token
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    # Identical claims produce an identical token, so skip re-signing
+    try:
+        cache_key = tuple(sorted(to_encode.items()))
+        encoded_jwt = _signed_token_cache.get(cache_key)
+    except TypeError:
+        cache_key = encoded_jwt = None
+    
+    if encoded_jwt is None:
+        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+        if cache_key is not None:
+            _signed_token_cache[cache_key] = encoded_jwt
+            if len(_signed_token_cache) > SIGNED_TOKEN_CACHE_SIZE:
+                _signed_token_cache.popitem(last=False)
+    
     return encoded_jwt
 
 
+_token_cache: "OrderedDict[str, tuple[float, TokenData]]" = OrderedDict()
+
+
 def verify_token(token: str) -> Optional[TokenData]:
     """
     Verify and decode a JWT token.
     
+    Valid tokens are cached for up to TOKEN_CACHE_TTL seconds, capped at
+    their expiry; invalid tokens are not cached.
+    
     Args:
         token: JWT token to verify
         
     Returns:
         TokenData if valid, None otherwise
     """
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        expires_at, token_data = cached
+        if now < expires_at:
+            _token_cache.move_to_end(token)
+            return token_data
+        del _token_cache[token]
+    
+    token_data = _decode_token(token)
+    if token_data is not None:
+        expires_at = now + TOKEN_CACHE_TTL
+        if token_data.exp is not None:
+            expires_at = min(expires_at, token_data.exp.timestamp())
+        _token_cache[token] = (expires_at, token_data)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return token_data
+
+
+def _decode_token(token: str) -> Optional[TokenData]:
+    """Decode a JWT token, verifying its signature and expiry."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         address = payload.get("address")
@@ -217,14 +313,27 @@ def generate_nonce() -> str:
 
 def validate_ethereum_address(address: str) -> bool:
     """Validate an Ethereum address."""
-    try:
-        # Check if it's a valid address format
-        if not Web3.is_address(address):
-            return False
-        
-        # Convert to checksum address to ensure proper casing
-        Web3.to_checksum_address(address)
+    # Checked before the cache so unhashable input returns False
+    if not isinstance(address, str):
+        return False
+    
+    return _validate_address_str(address)
+
+
+@lru_cache(maxsize=4096)
+def _validate_address_str(address: str) -> bool:
+    """Validate an Ethereum address string (cached)."""
+    if not _ADDRESS_RE.fullmatch(address):
+        return False
+    
+    # Single-case addresses carry no checksum; only mixed case needs the
+    # keccak-based EIP-55 check
+    body = address[-40:]
+    if body == body.lower() or body == body.upper():
         return True
+    
+    try:
+        return Web3.is_address(address)
     except Exception:
         return False
 
@@ -286,17 +395,131 @@ class RateLimiter:
 rate_limiter = RateLimiter(max_requests=100, window_seconds=3600)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+class NonceStore:
+    """
+    Bounded in-memory nonce storage with expiry.
+    
+    Nonces are only consumed by a successful login, so abandoned ones would
+    otherwise accumulate forever. Entries expire after ttl_seconds and the
+    oldest are evicted once max_size is reached.
+    
+    Expired nonces are also removed when they expire, not only on the next
+    access: a single event loop timer is kept armed for the oldest entry.
+    """
+    
+    def __init__(self, max_size: int = 100_000, ttl_seconds: int = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._nonces: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._expiry_timer: Optional[asyncio.TimerHandle] = None
+        self._expiry_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def set(self, address: str, nonce: str) -> None:
+        """
+        Store the current nonce for an address, replacing any previous one.
+        
+        Args:
+            address: Lowercased wallet address
+            nonce: Issued nonce
+        """
+        self._nonces.pop(address, None)
+        self._nonces[address] = (time.monotonic(), nonce)
+        
+        if len(self._nonces) > self.max_size:
+            self._nonces.popitem(last=False)
+        
+        self._schedule_expiry()
+    
+    def get(self, address: str) -> Optional[str]:
+        """
+        Get the unexpired nonce for an address.
+        
+        Args:
+            address: Lowercased wallet address
+            
+        Returns:
+            Nonce if present and not expired, None otherwise
+        """
+        self._purge_expired()
+        entry = self._nonces.get(address)
+        return entry[1] if entry else None
+    
+    def pop(self, address: str) -> Optional[str]:
+        """
+        Remove and return the unexpired nonce for an address.
+        
+        Args:
+            address: Lowercased wallet address
+            
+        Returns:
+            Nonce if present and not expired, None otherwise
+        """
+        self._purge_expired()
+        entry = self._nonces.pop(address, None)
+        return entry[1] if entry else None
+    
+    def _purge_expired(self) -> None:
+        """Drop expired nonces; insertion order is expiry order."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._nonces:
+            address, (issued_at, _) = next(iter(self._nonces.items()))
+            if issued_at > cutoff:
+                break
+            del self._nonces[address]
+    
+    def _schedule_expiry(self) -> None:
+        """Arm the expiry timer for the oldest nonce if none is pending."""
+        if not self._nonces:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside the event loop expiry stays lazy
+            return
+        
+        # A timer left on a previous (e.g. closed) loop would never fire
+        if self._expiry_timer is not None and self._expiry_loop is loop:
+            return
+        
+        issued_at, _ = next(iter(self._nonces.values()))
+        delay = max(0.0, issued_at + self.ttl_seconds - time.monotonic())
+        self._expiry_timer = loop.call_later(delay, self._on_expiry)
+        self._expiry_loop = loop
+    
+    def _on_expiry(self) -> None:
+        """Drop expired nonces and re-arm for the next one."""
+        self._expiry_timer = None
+        self._purge_expired()
+        self._schedule_expiry()
+    
+    def __len__(self) -> int:
+        self._purge_expired()
+        return len(self._nonces)
+
+
+# Global nonce store instance
+nonce_store = NonceStore(ttl_seconds=settings.NONCE_TTL_SECONDS)
+
+
+async def get_current_user(
+    response: Response,
+    token: str = Depends(security)
+) -> TokenData:
     """
     Dependency to get current authenticated user from JWT token.
     
+    A token within TOKEN_RENEW_WINDOW seconds of expiry is renewed in the
+    same response (RENEWED_TOKEN_HEADER), so clients don't need a separate
+    refresh round-trip.
+    
     Args:
-        credentials: HTTP Bearer token credentials
+        response: Response for the renewed token header
+        token: HTTP Bearer token
         
     Returns:
         TokenData if authenticated, raises HTTPException otherwise
     """
-    token = credentials.credentials
     token_data = verify_token(token)
     
     if token_data is None:
@@ -306,6 +529,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if (
+        token_data.exp is not None
+        and token_data.exp.timestamp() - time.time() < TOKEN_RENEW_WINDOW
+    ):
+        response.headers[RENEWED_TOKEN_HEADER] = create_access_token(
+            data={"address": token_data.address},
+            expires_delta=timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+        )
+    
     return token_data
 
 
@@ -337,14 +569,14 @@ async def get_current_user_ws(
 
 
 async def get_current_user_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+    token: Optional[str] = Depends(optional_security)
 ) -> Optional[TokenData]:
     """
     Optional authentication dependency.
     Returns user data if authenticated, None otherwise.
     Does not raise HTTPException.
     """
-    if not credentials:
+    if not token:
         return None
     
-    return verify_token(credentials.credentials)
\ No newline at end of file
+    return verify_token(token)
\ No newline at end of file
@@ -26,6 +26,7 @@ class Settings(BaseSettings):
     JWT_SECRET: str = Field(default="your-secret-key-here", env="JWT_SECRET")
     JWT_ALGORITHM: str = Field(default="HS256", env="JWT_ALGORITHM")
     JWT_EXPIRATION_HOURS: int = Field(default=24, env="JWT_EXPIRATION_HOURS")
+    NONCE_TTL_SECONDS: int = Field(default=300, env="NONCE_TTL_SECONDS")
     
     # Chain IDs
     SUPPORTED_CHAINS: List[int] = Field(
@@ -49,6 +50,9 @@ class Settings(BaseSettings):
         default="https://openrouter.ai/api/v1",
         env="OPENROUTER_BASE_URL"
     )
+    # Direct OpenAI access (only used for the discounted Batch API)
+    OPENAI_API_KEY: str = Field(default="", env="OPENAI_API_KEY")
+    
     DEFAULT_MODEL: str = Field(default="google/gemini-2.0-flash", env="DEFAULT_MODEL")
     PORTFOLIO_AGENT_MODEL: str = Field(
         default="google/gemini-2.0-flash",
@@ -69,6 +73,8 @@ class Settings(BaseSettings):
     
     # Metrics Configuration
     ENABLE_METRICS: bool = Field(default=True, env="ENABLE_METRICS")
+    # Count completion tokens locally when the provider omits usage data
+    STRICT_TOKEN_ACCOUNTING: bool = Field(default=False, env="STRICT_TOKEN_ACCOUNTING")
     
     # Admin Configuration
     ADMIN_WALLET_ADDRESSES: List[str] = Field(
@@ -2,9 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
+import aiohttp
 import uvicorn
 
 from app.api import health, portfolio, auth, chat, mcp, metrics
+from app.agents import agent_config_manager, preload_encodings, precount_system_prompts
+from app.core.auth import RENEWED_TOKEN_HEADER
 from app.core.config import settings
 from app.core.middleware import AuthMiddleware, RateLimitMiddleware
 from app.services.price_cache import cleanup_expired_entries
@@ -14,10 +17,23 @@ async def lifespan(app: FastAPI):
     # Startup
     print(f"Starting OptimizeDeFi API on {settings.HOST}:{settings.PORT}")
     
+    # Warm tokenizer encodings and system prompt token counts
+    try:
+        preload_encodings(agent_config_manager.get_model_usage().keys())
+        precount_system_prompts(agent_config_manager.get_all_configs().values())
+        print("Preloaded tokenizer encodings")
+    except Exception as e:
+        print(f"Failed to preload tokenizer encodings: {e}")
+    
     # Start background task for cache cleanup
     cleanup_task = asyncio.create_task(cleanup_expired_entries(interval=300))
     print("Started price cache cleanup task")
     
+    # Shared HTTP client for outbound probes (keeps connections pooled)
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+    )
+    
     yield
     
     # Shutdown
@@ -27,6 +43,7 @@ async def lifespan(app: FastAPI):
         await cleanup_task
     except asyncio.CancelledError:
         pass
+    await app.state.http.close()
 
 app = FastAPI(
     title="OptimizeDeFi API",
@@ -42,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[RENEWED_TOKEN_HEADER],
 )
 
 # Add rate limiting middleware
@@ -166,15 +166,19 @@ class CostCalculator:
         self,
         model: str,
         input_tokens: int,
-        output_tokens: int
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
     ) -> Tuple[float, Dict[str, Any]]:
         """
         Calculate cost for token usage.
         
         Args:
             model: Model ID
-            input_tokens: Number of input tokens
+            input_tokens: Number of input tokens (including cached tokens)
             output_tokens: Number of output tokens
+            cache_read_tokens: Input tokens served from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
             
         Returns:
             Tuple of (total_cost, pricing_details)
@@ -190,8 +194,17 @@ class CostCalculator:
         prompt_price = float(pricing.get("prompt", 0))
         completion_price = float(pricing.get("completion", 0))
         
+        # Cached input is billed at its own tier when the model publishes one
+        cache_read_price = float(pricing.get("input_cache_read") or prompt_price)
+        cache_write_price = float(pricing.get("input_cache_write") or prompt_price)
+        uncached_tokens = max(0, input_tokens - cache_read_tokens - cache_write_tokens)
+        
         # Calculate costs (prices are per token)
-        input_cost = input_tokens * prompt_price
+        input_cost = (
+            uncached_tokens * prompt_price
+            + cache_read_tokens * cache_read_price
+            + cache_write_tokens * cache_write_price
+        )
         output_cost = output_tokens * completion_price
         total_cost = input_cost + output_cost
         
@@ -201,6 +214,8 @@ class CostCalculator:
             "model_name": model_data.get("name", model),
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
             "input_cost": round(input_cost, 6),
             "output_cost": round(output_cost, 6),
             "total_cost": round(total_cost, 6),
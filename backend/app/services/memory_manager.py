@@ -240,7 +240,7 @@ class ConversationMemoryManager:
                 
                 # Get summary
                 response = await summarizer.invoke(prompt)
-                summary_text = response.content if hasattr(response, 'content') else str(response)
+                summary_text = summarizer._response_text(response)
                 
                 # Create new summary message
                 if session.summary:
@@ -67,6 +67,72 @@ class RateLimitStatus:
         }
 
 
+class TokenBucket:
+    """Token bucket that refills continuously at a fixed rate."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the token bucket.
+        
+        Args:
+            rate: Units added per second
+            capacity: Maximum units the bucket can hold (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._available = capacity
+        self._updated_at = time.monotonic()
+    
+    def _refill(self):
+        """Add units accrued since the last update."""
+        now = time.monotonic()
+        self._available = min(
+            self.capacity,
+            self._available + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+    
+    async def consume(self, amount: float = 1.0, max_wait: float = 60.0) -> bool:
+        """
+        Take units from the bucket, waiting for them to refill if needed.
+        
+        Args:
+            amount: Units to take (capped at capacity)
+            max_wait: Maximum time to wait in seconds
+            
+        Returns:
+            True if consumed, False if it would take longer than max_wait
+        """
+        amount = min(amount, self.capacity)
+        
+        self._refill()
+        wait_time = max(0.0, (amount - self._available) / self.rate)
+        if wait_time > max_wait:
+            return False
+        
+        # Reserve the units up front (the balance may go negative) so later
+        # callers queue behind this one, then wait without blocking them
+        self._available -= amount
+        if wait_time:
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self.refund(amount)
+                raise
+        
+        return True
+    
+    def refund(self, amount: float = 1.0):
+        """
+        Return units taken for a request that was not made.
+        
+        Args:
+            amount: Units to return (capped at capacity)
+        """
+        self._refill()
+        self._available = min(self.capacity, self._available + min(amount, self.capacity))
+
+
 class RateLimitManager:
     """Manage rate limits with monitoring and backoff."""
     
@@ -96,6 +162,9 @@ class RateLimitManager:
         RateLimitType.CONCURRENT_REQUESTS: 10,
     }
     
+    # Seconds' worth of the per-minute rates that may be sent back to back
+    BURST_SECONDS = 5
+    
     def __init__(self):
         """Initialize the rate limit manager."""
         # Track usage per model and limit type
@@ -113,6 +182,9 @@ class RateLimitManager:
         # Model-specific rate limits
         self._model_limits: Dict[str, Dict[RateLimitType, int]] = {}
         
+        # Token buckets that pace requests and tokens per model
+        self._buckets: Dict[str, Dict[RateLimitType, TokenBucket]] = {}
+        
         # Lock for thread safety
         self._lock = asyncio.Lock()
     
@@ -129,6 +201,7 @@ class RateLimitManager:
             limits: Dictionary of rate limit types to limits
         """
         self._model_limits[model] = limits
+        self._buckets.pop(model, None)
         logger.info(
             "Set custom rate limits",
             model=model,
@@ -148,6 +221,79 @@ class RateLimitManager:
         # Use fallback limits
         return self.FALLBACK_LIMITS
     
+    def _get_buckets(self, model: str) -> Dict[RateLimitType, TokenBucket]:
+        """Get or create the per-minute token buckets for a model."""
+        if model not in self._buckets:
+            limits = self._get_limits(model)
+            buckets = {}
+            for limit_type in (
+                RateLimitType.REQUESTS_PER_MINUTE,
+                RateLimitType.TOKENS_PER_MINUTE
+            ):
+                if limit_type in limits:
+                    # Only a few seconds' allowance may go out at once; beyond
+                    # that, callers are spaced out at the per-minute rate
+                    rate = limits[limit_type] / 60
+                    buckets[limit_type] = TokenBucket(
+                        rate=rate,
+                        capacity=max(1.0, rate * self.BURST_SECONDS)
+                    )
+            self._buckets[model] = buckets
+        
+        return self._buckets[model]
+    
+    async def _pace(
+        self,
+        model: str,
+        tokens: Optional[int],
+        max_wait: float
+    ) -> bool:
+        """
+        Smooth bursts by spacing requests out at the per-minute rates.
+        
+        Up to BURST_SECONDS of allowance is served immediately; requests
+        beyond that wait for the buckets to refill.
+        
+        Args:
+            model: Model ID
+            tokens: Number of tokens
+            max_wait: Maximum time to wait in seconds
+            
+        Returns:
+            True if paced within max_wait, False otherwise
+        """
+        buckets = self._get_buckets(model)
+        
+        request_bucket = buckets.get(RateLimitType.REQUESTS_PER_MINUTE)
+        if request_bucket and not await request_bucket.consume(1, max_wait):
+            return False
+        
+        token_bucket = buckets.get(RateLimitType.TOKENS_PER_MINUTE)
+        if tokens and token_bucket and not await token_bucket.consume(tokens, max_wait):
+            if request_bucket:
+                request_bucket.refund(1)
+            return False
+        
+        return True
+    
+    def _refund_pace(self, model: str, tokens: Optional[int]):
+        """
+        Return paced units for a request that was rejected afterwards.
+        
+        Args:
+            model: Model ID
+            tokens: Number of tokens
+        """
+        buckets = self._get_buckets(model)
+        
+        request_bucket = buckets.get(RateLimitType.REQUESTS_PER_MINUTE)
+        if request_bucket:
+            request_bucket.refund(1)
+        
+        token_bucket = buckets.get(RateLimitType.TOKENS_PER_MINUTE)
+        if tokens and token_bucket:
+            token_bucket.refund(tokens)
+    
     def _clean_old_usage(
         self,
         usage_deque: deque,
@@ -267,6 +413,16 @@ class RateLimitManager:
         """
         start_time = time.time()
         
+        # Pace through the token buckets first so bursts are spread out
+        # instead of tripping the window limits and backing off
+        if wait and not await self._pace(model, tokens, max_wait):
+            logger.warning(
+                "Rate limit wait exceeded maximum",
+                model=model,
+                max_wait=max_wait
+            )
+            return False
+        
         while True:
             statuses = await self.check_rate_limit(model, tokens)
             
@@ -314,6 +470,7 @@ class RateLimitManager:
             
             # Check if we've waited too long
             if time.time() - start_time + wait_time > max_wait:
+                self._refund_pace(model, tokens)
                 logger.warning(
                     "Rate limit wait exceeded maximum",
                     model=model,
@@ -330,7 +487,11 @@ class RateLimitManager:
                 exceeded=[s.limit_type.value for s in exceeded_statuses]
             )
             
-            await asyncio.sleep(wait_time)
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self._refund_pace(model, tokens)
+                raise
     
     def _calculate_wait_time(
         self,
@@ -484,6 +645,9 @@ class RateLimitManager:
             # Clear backoff
             self._backoff_until.pop(model, None)
             self._consecutive_failures[model] = 0
+            
+            # Start with full buckets
+            self._buckets.pop(model, None)
         
         logger.info("Rate limits reset", model=model)
 
@@ -29,6 +29,7 @@ class ChatState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
     current_agent: Optional[str]
     routing_result: Optional[Dict[str, Any]]
+    speculative_response: Optional[Any]
     metadata: Dict[str, Any]
     error: Optional[str]
 
@@ -154,13 +155,23 @@ class ChatWorkflow:
                 workflow="chat",
                 query=user_message.content[:100]
             ) as metrics:
-                # Route query
+                # Route query, letting the general agent start answering
+                # speculatively while the orchestrator decides
+                context = state.get("metadata", {})
                 routing_result = await self.orchestrator.route_query(
                     user_message.content,
-                    context=state.get("metadata", {})
+                    context=context,
+                    speculate=lambda: self._run_agent(
+                        self.general_agent,
+                        user_message.content,
+                        context.copy()
+                    )
                 )
                 
                 # Update state
+                state["speculative_response"] = routing_result.pop(
+                    "speculative_response", None
+                )
                 state["routing_result"] = routing_result
                 state["current_agent"] = routing_result["selected_agent"]
                 
@@ -242,26 +253,12 @@ class ChatWorkflow:
                 if state.get("routing_result"):
                     context["routing"] = state["routing_result"]
                 
-                # Execute agent
-                if agent.tools:
-                    response, tool_calls = await agent.invoke_with_tools(
-                        user_message.content,
-                        context=context
-                    )
-                    
-                    # Log tool usage
-                    if tool_calls:
-                        performance_logger.log_custom(
-                            "agent_tool_usage",
-                            agent=agent.name,
-                            tools_called=len(tool_calls),
-                            tool_names=[tc.get("name") for tc in tool_calls]
-                        )
+                # Execute agent, reusing a confirmed speculative answer
+                speculative_response = state.get("speculative_response")
+                if agent_type == AgentType.GENERAL.value and speculative_response is not None:
+                    response = speculative_response
                 else:
-                    response = await agent.invoke(
-                        user_message.content,
-                        context=context
-                    )
+                    response = await self._run_agent(agent, user_message.content, context)
                 
                 # Convert response to AIMessage if needed
                 if isinstance(response, str):
@@ -299,6 +296,29 @@ class ChatWorkflow:
             )
             return state
     
+    async def _run_agent(
+        self,
+        agent: Any,
+        query: str,
+        context: Dict[str, Any]
+    ) -> Any:
+        """Invoke an agent, with its tools if it has any."""
+        if not agent.tools:
+            return await agent.invoke(query, context=context)
+        
+        response, tool_calls = await agent.invoke_with_tools(query, context=context)
+        
+        # Log tool usage
+        if tool_calls:
+            performance_logger.log_custom(
+                "agent_tool_usage",
+                agent=agent.name,
+                tools_called=len(tool_calls),
+                tool_names=[tc.get("name") for tc in tool_calls]
+            )
+        
+        return response
+    
     async def _handle_error(self, state: ChatState) -> ChatState:
         """Handle errors in the workflow."""
         error_msg = state.get("error", "Unknown error occurred")
@@ -356,6 +376,7 @@ class ChatWorkflow:
             "messages": messages,
             "current_agent": None,
             "routing_result": None,
+            "speculative_response": None,
             "metadata": metadata or {},
             "error": None
         }
@@ -418,6 +439,7 @@ class ChatWorkflow:
             "messages": messages,
             "current_agent": None,
             "routing_result": None,
+            "speculative_response": None,
             "metadata": metadata or {},
             "error": None
         }
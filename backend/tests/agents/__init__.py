@@ -0,0 +1 @@
+"""Agent tests."""
\ No newline at end of file
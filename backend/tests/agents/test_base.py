@@ -0,0 +1,230 @@
+"""Tests for the base agent."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+from app.agents import base
+from app.agents.base import BaseAgent
+
+
+class _TestAgent(BaseAgent):
+    """Minimal concrete agent."""
+
+    def _get_default_system_prompt(self) -> str:
+        return "You are a test agent."
+
+
+class TestDumpsJson:
+    """Test prompt JSON serialization."""
+
+    def test_output_is_compact_with_sorted_keys(self):
+        """Test that equal data always serializes to the same compact text."""
+        assert base.dumps_json({"b": 1, "a": [1, 2]}) == '{"a":[1,2],"b":1}'
+        assert base.dumps_json({"a": [1, 2], "b": 1}) == '{"a":[1,2],"b":1}'
+
+    def test_indent(self):
+        """Test that indent pretty-prints with sorted keys."""
+        assert base.dumps_json({"b": 1, "a": 2}, indent=True) == '{\n  "a": 2,\n  "b": 1\n}'
+
+    def test_wide_integers_fall_back_to_json(self):
+        """Test that integers too wide for orjson are still serialized."""
+        wei = 10 ** 30
+        
+        assert base.dumps_json({"b": wei, "a": 1}) == f'{{"a":1,"b":{wei}}}'
+
+
+class TestTokenEstimation:
+    """Test input token estimation."""
+
+    def test_anthropic_system_message_uses_cache_control_blocks(self):
+        """Test that Anthropic models get a cacheable system content block."""
+        agent = _TestAgent(name="Test", model="anthropic/claude-3.5-sonnet")
+        
+        messages, _ = agent._prepare_messages([HumanMessage(content="Hi")])
+        
+        assert isinstance(messages[0], SystemMessage)
+        assert messages[0].content[0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_prepared_anthropic_messages_can_be_replayed(self):
+        """Test that replaying prepared messages (tool follow-ups) counts the same."""
+        agent = _TestAgent(name="Test", model="anthropic/claude-3.5-sonnet")
+        
+        messages, tokens = agent._prepare_messages([HumanMessage(content="Hi")])
+        replayed, replayed_tokens = agent._prepare_messages(
+            [*messages, AIMessage(content="Hello")]
+        )
+        
+        assert replayed[0] is messages[0]
+        assert replayed_tokens == tokens + agent._estimate_tokens([AIMessage(content="Hello")])
+
+    def test_list_content_counts_block_text(self):
+        """Test that list content is counted by the text of its blocks."""
+        agent = _TestAgent(name="Test", model="openai/gpt-4o-mini")
+        
+        blocks = SystemMessage(content=[
+            {"type": "text", "text": "You are a test agent."},
+            {"type": "text", "text": " Be brief."}
+        ])
+        plain = SystemMessage(content="You are a test agent. Be brief.")
+        
+        assert agent._estimate_tokens([blocks]) == agent._estimate_tokens([plain])
+
+
+def _fake_encoding():
+    """Encoding mock that counts one token per character."""
+    encoding = MagicMock()
+    encoding.name = "fake"
+    encoding.encode_batch.side_effect = (
+        lambda texts, num_threads: [list(text) for text in texts]
+    )
+    return encoding
+
+
+class TestTokenCountCache:
+    """Test the shared token count cache."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start each test with an empty cache."""
+        base._token_count_cache.clear()
+        yield
+        base._token_count_cache.clear()
+
+    def test_repeated_contents_are_encoded_once(self):
+        """Test that only cache misses are sent to the encoder."""
+        encoding = _fake_encoding()
+        
+        assert base._count_tokens_cached(encoding, ["abc", "de"]) == [3, 2]
+        assert base._count_tokens_cached(encoding, ["de", "fghi"]) == [2, 4]
+        
+        batches = [call.args[0] for call in encoding.encode_batch.call_args_list]
+        assert batches == [["abc", "de"], ["fghi"]]
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache is bounded and evicts in LRU order."""
+        encoding = _fake_encoding()
+        
+        with patch.object(base, "_TOKEN_COUNT_CACHE_SIZE", 2):
+            base._count_tokens_cached(encoding, ["a", "bb"])
+            base._count_tokens_cached(encoding, ["a"])  # Refresh "a"
+            base._count_tokens_cached(encoding, ["ccc"])
+        
+        assert list(base._token_count_cache) == [("fake", "a"), ("fake", "ccc")]
+
+
+class _ChatStartRecorder(BaseCallbackHandler):
+    """Callback handler recording chat model starts."""
+
+    def __init__(self):
+        self.starts = 0
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.starts += 1
+
+
+class TestCallbacks:
+    """Test callback propagation."""
+
+    @pytest.mark.asyncio
+    async def test_invoke_keeps_inherited_callbacks(self):
+        """Test that LLM calls inside a run still report to the run's callbacks."""
+        agent = _TestAgent(name="Test", model="openai/gpt-4o-mini")
+        agent.llm = FakeListChatModel(responses=["Hello"])
+        agent._acquire_rate_limit = AsyncMock(return_value=True)
+        agent._release_rate_limit = AsyncMock()
+        agent._track_response_usage = AsyncMock()
+        recorder = _ChatStartRecorder()
+        
+        async def node(query: str) -> str:
+            response = await agent.invoke(query)
+            return response.content
+        
+        result = await RunnableLambda(node).ainvoke("Hi", config={"callbacks": [recorder]})
+        
+        assert result == "Hello"
+        assert recorder.starts == 1
+
+
+class TestBatchInvoke:
+    """Test batched invocation."""
+
+    @pytest.fixture
+    def agent(self):
+        """Agent backed by a fake LLM, with rate limiting and usage tracking mocked."""
+        agent = _TestAgent(name="Test", model="openai/gpt-4o-mini")
+        agent.llm = FakeListChatModel(responses=["a", "b", "c"])
+        agent._acquire_rate_limit = AsyncMock(return_value=True)
+        agent._release_rate_limit = AsyncMock()
+        agent._track_response_usage = AsyncMock()
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_each_item_is_rate_limited_and_tracked(self, agent):
+        """Test that every item acquires its own rate limit capacity."""
+        batches = [[HumanMessage(content=f"Question {i}")] for i in range(3)]
+        
+        results = await agent.batch_invoke(batches)
+        
+        assert len(results) == 3
+        assert all(isinstance(result, AIMessage) for result in results)
+        assert agent._acquire_rate_limit.await_count == 3
+        assert agent._release_rate_limit.await_count == 3
+        assert agent._track_response_usage.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_item_fails_alone(self, agent):
+        """Test that an item refused by the rate limiter doesn't fail the others."""
+        agent._acquire_rate_limit = AsyncMock(side_effect=[True, False, True])
+        batches = [[HumanMessage(content=f"Question {i}")] for i in range(3)]
+        
+        results = await agent.batch_invoke(batches)
+        
+        assert isinstance(results[0], AIMessage)
+        assert isinstance(results[1], Exception)
+        assert isinstance(results[2], AIMessage)
+        assert agent._release_rate_limit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_api_tracks_usage(self, agent):
+        """Test that Batch API results are recorded for cost tracking."""
+        output = "\n".join(
+            json.dumps({
+                "custom_id": str(i),
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "model": "gpt-4o-mini",
+                        "choices": [{"message": {"content": f"Answer {i}"}}],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 5}
+                    }
+                }
+            })
+            for i in range(2)
+        )
+        client = MagicMock()
+        client.files.create = AsyncMock(return_value=SimpleNamespace(id="file"))
+        client.batches.create = AsyncMock(return_value=SimpleNamespace(
+            id="batch",
+            status="completed",
+            output_file_id="out",
+            error_file_id=None
+        ))
+        client.files.content = AsyncMock(return_value=SimpleNamespace(text=output))
+        client.close = AsyncMock()
+        
+        with patch("app.agents.base.AsyncOpenAI", return_value=client), \
+             patch("app.agents.base.settings.OPENAI_API_KEY", "test-key"):
+            results = await agent.batch_invoke(
+                [[HumanMessage(content="One")], [HumanMessage(content="Two")]],
+                use_batch_api=True
+            )
+        
+        assert [result.content for result in results] == ["Answer 0", "Answer 1"]
+        assert agent._track_response_usage.await_count == 2
@@ -0,0 +1,36 @@
+"""Tests for agent configuration."""
+
+from app.agents.config import AgentConfig, AgentType
+
+
+def _config(**kwargs) -> AgentConfig:
+    """Build a config with default test values."""
+    return AgentConfig(
+        name="Test",
+        agent_type=AgentType.GENERAL,
+        model="openai/gpt-4o",
+        **kwargs
+    )
+
+
+class TestAgentConfigToDict:
+    """Test dictionary conversion of agent configs."""
+
+    def test_returned_dict_does_not_change_the_cache(self):
+        """Test that editing a returned dict doesn't affect later calls."""
+        config = _config()
+        
+        first = config.to_dict()
+        first["model"] = "other/model"
+        
+        assert config.to_dict()["model"] == "openai/gpt-4o"
+
+    def test_cache_is_ignored_by_equality_and_repr(self):
+        """Test that building the dict doesn't change equality or repr."""
+        config = _config()
+        other = _config()
+        
+        config.to_dict()
+        
+        assert config == other
+        assert repr(config) == repr(other)
@@ -0,0 +1,80 @@
+"""Tests for the general agent."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.general import GeneralAgent
+
+
+@pytest.fixture
+def agent():
+    """General agent with the LLM call mocked."""
+    agent = GeneralAgent()
+    agent.invoke = AsyncMock(return_value=AIMessage(content="Explanation"))
+    return agent
+
+
+class TestResponseCache:
+    """Test caching of educational answers."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_skips_llm(self, agent):
+        """Test that a repeated request is answered without invoking the LLM."""
+        first = await agent.explain_concept("impermanent loss")
+        second = await agent.explain_concept("impermanent loss")
+        
+        assert first == second == "Explanation"
+        assert agent.invoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_arguments_are_not_shared(self, agent):
+        """Test that different arguments produce separate cache entries."""
+        await agent.explain_concept("impermanent loss")
+        await agent.explain_concept("impermanent loss", examples=False)
+        
+        assert agent.invoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_equivalent_criteria_share_an_entry(self, agent):
+        """Test that reordered criteria reuse the same answer."""
+        await agent.compare_protocols("Aave", "Compound", ["fees", "security"])
+        await agent.compare_protocols("Aave", "Compound", ["security", "fees"])
+        
+        assert agent.invoke.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_prompt_keeps_criteria_order(self, agent):
+        """Test that criteria are listed in the order the caller gave them."""
+        await agent.compare_protocols("Aave", "Compound", ["security", "fees"])
+        
+        prompt = agent.invoke.await_args.args[0]
+        assert "- security\n- fees" in prompt
+
+    @pytest.mark.asyncio
+    async def test_equivalent_aspects_share_an_entry(self, agent):
+        """Test that reordered aspects reuse the answer and keep their order."""
+        await agent.analyze_protocol("Aave", ["risks", "overview"])
+        await agent.analyze_protocol("Aave", ["overview", "risks"])
+        
+        assert agent.invoke.await_count == 1
+        assert "- risks\n- overview" in agent.invoke.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_refreshed(self, agent):
+        """Test that answers older than the TTL are fetched again."""
+        agent.RESPONSE_CACHE_TTL = 0
+        
+        await agent.explain_concept("impermanent loss")
+        await agent.explain_concept("impermanent loss")
+        
+        assert agent.invoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_market_insight_is_never_cached(self, agent):
+        """Test that time-sensitive market insights always reach the LLM."""
+        await agent.market_insight("stablecoins")
+        await agent.market_insight("stablecoins")
+        
+        assert agent.invoke.await_count == 2
@@ -0,0 +1,149 @@
+"""Tests for the orchestrator agent."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.agents.orchestrator import OrchestratorAgent
+
+
+@pytest.fixture
+def orchestrator():
+    """Orchestrator with LLM routing mocked."""
+    agent = OrchestratorAgent()
+    agent._llm_based_routing = AsyncMock(return_value={
+        "selected_agent": "general",
+        "confidence": 0.9,
+        "reasoning": "LLM decision",
+        "extracted_params": {}
+    })
+    return agent
+
+
+class TestRouteQuery:
+    """Test routing decisions."""
+
+    @pytest.mark.asyncio
+    async def test_confident_pattern_skips_llm(self, orchestrator):
+        """Test that a confident pattern match never starts LLM routing."""
+        result = await orchestrator.route_query("Show my portfolio balance")
+        
+        assert result["selected_agent"] == "portfolio"
+        assert result["method"] == "pattern"
+        orchestrator._llm_based_routing.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_query_uses_llm(self, orchestrator):
+        """Test that queries without a confident pattern are routed by the LLM."""
+        result = await orchestrator.route_query("Tell me something interesting")
+        
+        assert result["reasoning"] == "LLM decision"
+        orchestrator._llm_based_routing.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_speculative_answer_returned_on_hit(self, orchestrator):
+        """Test that a confirmed speculative answer is attached to the decision."""
+        speculate = AsyncMock(return_value="Answer")
+        
+        result = await orchestrator.route_query(
+            "What is gas and how do swap fees affect price?", speculate=speculate
+        )
+        
+        assert result["speculative_response"] == "Answer"
+
+    @pytest.mark.asyncio
+    async def test_speculation_cancelled_when_routing_is_cancelled(self, orchestrator):
+        """Test that cancelling routing also cancels the speculative answer."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+        
+        async def slow_routing(query, context=None):
+            await asyncio.sleep(10)
+        
+        async def speculate():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        orchestrator._llm_based_routing = slow_routing
+        task = asyncio.create_task(orchestrator.route_query(
+            "What is gas and how do swap fees affect price?", speculate=speculate
+        ))
+        await asyncio.wait_for(started.wait(), 1)
+        task.cancel()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+class TestRouteCache:
+    """Test caching of routing decisions."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_reuses_decision(self, orchestrator):
+        """Test that a repeated query is served from the cache."""
+        await orchestrator.route_query("Tell me something interesting")
+        result = await orchestrator.route_query("  tell me something INTERESTING ")
+        
+        assert result["reasoning"] == "LLM decision"
+        orchestrator._llm_based_routing.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_context_is_part_of_the_key(self, orchestrator):
+        """Test that the same query with a different context is routed again."""
+        await orchestrator.route_query("Tell me something", {"chain_id": 1})
+        await orchestrator.route_query("Tell me something", {"chain_id": 137})
+        
+        assert orchestrator._llm_based_routing.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_decision_is_a_copy(self, orchestrator):
+        """Test that callers can't modify the cached decision."""
+        first = await orchestrator.route_query("Tell me something interesting")
+        first["extracted_params"]["token"] = "ETH"
+        second = await orchestrator.route_query("Tell me something interesting")
+        
+        assert second["extracted_params"] == {}
+
+    @pytest.mark.asyncio
+    async def test_expired_decision_is_routed_again(self, orchestrator):
+        """Test that decisions older than the TTL are not reused."""
+        orchestrator.ROUTE_CACHE_TTL = 0
+        
+        await orchestrator.route_query("Tell me something interesting")
+        await orchestrator.route_query("Tell me something interesting")
+        
+        assert orchestrator._llm_based_routing.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_decision_is_not_cached(self, orchestrator):
+        """Test that fallback decisions from failed routing are retried."""
+        orchestrator._llm_based_routing.return_value = {
+            "selected_agent": "general",
+            "confidence": 0.3,
+            "reasoning": "LLM routing failed",
+            "extracted_params": {},
+            "error": "timeout"
+        }
+        
+        await orchestrator.route_query("Tell me something interesting")
+        await orchestrator.route_query("Tell me something interesting")
+        
+        assert orchestrator._llm_based_routing.await_count == 2
+
+    def test_cache_is_bounded(self, orchestrator):
+        """Test that the least recently used decision is evicted."""
+        orchestrator.ROUTE_CACHE_SIZE = 2
+        decision = {"selected_agent": "general", "confidence": 0.9}
+        
+        orchestrator._cache_route("a", decision)
+        orchestrator._cache_route("b", decision)
+        orchestrator._get_cached_route("a")
+        orchestrator._cache_route("c", decision)
+        
+        assert list(orchestrator._route_cache) == ["a", "c"]
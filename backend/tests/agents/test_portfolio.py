@@ -0,0 +1,140 @@
+"""Tests for the portfolio agent."""
+
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from app.agents.portfolio import PortfolioAgent
+
+
+@pytest.fixture
+def agent():
+    """Portfolio agent."""
+    return PortfolioAgent()
+
+
+class TestEnhancedQuery:
+    """Test enhanced query construction."""
+
+    def test_context_is_not_modified(self, agent):
+        """Test that building the query leaves the caller's context untouched."""
+        context = {"user_preferences": {"risk": "low"}}
+        
+        agent._build_enhanced_query("Show my portfolio", context=context)
+        
+        assert context == {"user_preferences": {"risk": "low"}}
+
+    def test_preferences_edited_in_place_are_reflected(self, agent):
+        """Test that in-place edits to preferences reach the next query."""
+        context = {"user_preferences": {"risk": "low"}}
+        
+        agent._build_enhanced_query("Show my portfolio", context=context)
+        context["user_preferences"]["risk"] = "high"
+        query = agent._build_enhanced_query("Show my portfolio", context=context)
+        
+        assert '"risk":"high"' in query
+
+
+class _PortfolioTool:
+    """Fake get_portfolio tool that counts fetches."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self, wallet_address: str, chain_ids: list = None) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        return {"total_value_usd": 100.0, "tokens": [{"symbol": "ETH"}]}
+
+    def as_tool(self) -> StructuredTool:
+        return StructuredTool.from_function(
+            coroutine=self.fetch,
+            name="get_portfolio",
+            description="Get portfolio"
+        )
+
+
+class TestPortfolioSummaryCache:
+    """Test caching of portfolio summaries."""
+
+    @pytest.fixture
+    def fake_tool(self):
+        """Fake portfolio tool."""
+        return _PortfolioTool()
+
+    @pytest.fixture
+    def agent(self, fake_tool):
+        """Portfolio agent using the fake tool."""
+        return PortfolioAgent(tools=[fake_tool.as_tool()])
+
+    @pytest.mark.asyncio
+    async def test_repeated_summary_is_cached(self, agent, fake_tool):
+        """Test that a fresh summary is reused, ignoring address case."""
+        first = await agent.get_portfolio_summary("0xABC", [1])
+        second = await agent.get_portfolio_summary("0xabc", [1])
+        
+        assert first == second
+        assert first["token_count"] == 1
+        assert fake_tool.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_bypasses_cache(self, agent, fake_tool):
+        """Test that refresh always fetches fresh data."""
+        await agent.get_portfolio_summary("0xabc", [1])
+        await agent.get_portfolio_summary("0xabc", [1], refresh=True)
+        
+        assert fake_tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_summary_is_refetched(self, agent, fake_tool):
+        """Test that summaries older than the TTL are fetched again."""
+        agent.SUMMARY_CACHE_TTL = 0
+        
+        await agent.get_portfolio_summary("0xabc", [1])
+        await agent.get_portfolio_summary("0xabc", [1])
+        
+        assert fake_tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_summary_is_a_copy(self, agent):
+        """Test that callers can't modify the cached summary."""
+        first = await agent.get_portfolio_summary("0xabc", [1])
+        first["top_holdings"].append("BTC")
+        second = await agent.get_portfolio_summary("0xabc", [1])
+        
+        assert second["top_holdings"] == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_fetch(self, agent, fake_tool):
+        """Test that concurrent requests for the same key coalesce."""
+        fake_tool.release.clear()
+        
+        tasks = [
+            asyncio.create_task(agent.get_portfolio_summary("0xabc", [1]))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        fake_tool.release.set()
+        results = await asyncio.gather(*tasks)
+        
+        assert fake_tool.calls == 1
+        assert results[0] == results[1] == results[2]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self, agent, fake_tool):
+        """Test that one cancelled waiter leaves the fetch running for others."""
+        fake_tool.release.clear()
+        
+        cancelled = asyncio.create_task(agent.get_portfolio_summary("0xabc", [1]))
+        waiting = asyncio.create_task(agent.get_portfolio_summary("0xabc", [1]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        fake_tool.release.set()
+        
+        result = await waiting
+        
+        assert result["token_count"] == 1
+        assert fake_tool.calls == 1
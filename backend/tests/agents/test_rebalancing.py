@@ -0,0 +1,171 @@
+"""Tests for the rebalancing agent."""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.rebalancing import RebalancingAgent
+
+
+@pytest.fixture
+def agent():
+    """Rebalancing agent."""
+    return RebalancingAgent()
+
+
+class TestExtractJson:
+    """Test extracting JSON objects from LLM responses."""
+
+    def test_nested_object_is_returned_whole(self, agent):
+        """Test that nested objects don't end the match early."""
+        text = 'Result: {"a": {"b": 1}, "c": [2]} Done.'
+        
+        assert json.loads(agent._extract_json(text)) == {"a": {"b": 1}, "c": [2]}
+
+    def test_braces_in_strings_are_ignored(self, agent):
+        """Test that braces and escaped quotes inside strings are skipped."""
+        text = '{"note": "use {x} and \\"}\\"", "ok": true} trailing }'
+        
+        assert json.loads(agent._extract_json(text)) == {
+            "note": 'use {x} and "}"',
+            "ok": True
+        }
+
+    def test_first_object_is_returned(self, agent):
+        """Test that only the first of several objects is returned."""
+        assert agent._extract_json('{"a": 1} {"b": 2}') == '{"a": 1}'
+
+    @pytest.mark.parametrize("text", ["no json here", '{"unterminated": 1'])
+    def test_missing_object_returns_empty(self, agent, text):
+        """Test that text without a complete object yields an empty object."""
+        assert agent._extract_json(text) == "{}"
+
+
+class TestRebalancingProgress:
+    """Test rebalancing progress from allocation drift."""
+
+    TARGET = {"allocations": {"ETH": 60.0, "USDC": 40.0}}
+
+    def test_matching_allocations_are_complete(self, agent):
+        """Test that reaching the target reports full progress."""
+        assert agent._calculate_rebalancing_progress("exec", self.TARGET, self.TARGET) == 100.0
+
+    def test_progress_is_share_of_initial_drift_closed(self, agent):
+        """Test progress against a caller-tracked starting drift."""
+        current = {"allocations": {"ETH": 70.0, "USDC": 30.0}, "initial_drift": 40.0}
+        
+        # Drift is 20 of the starting 40
+        progress = agent._calculate_rebalancing_progress("exec", current, self.TARGET)
+        assert progress == pytest.approx(50.0)
+
+    def test_first_poll_sets_starting_drift(self, agent):
+        """Test that progress is measured from the drift at the first poll."""
+        start = {"allocations": {"ETH": 80.0, "USDC": 20.0}}
+        halfway = {"allocations": {"ETH": 70.0, "USDC": 30.0}}
+        
+        assert agent._calculate_rebalancing_progress("exec", start, self.TARGET) == 0.0
+        progress = agent._calculate_rebalancing_progress("exec", halfway, self.TARGET)
+        assert progress == pytest.approx(50.0)
+
+    def test_executions_are_tracked_separately(self, agent):
+        """Test that each execution has its own starting drift."""
+        start = {"allocations": {"ETH": 80.0, "USDC": 20.0}}
+        halfway = {"allocations": {"ETH": 70.0, "USDC": 30.0}}
+        
+        agent._calculate_rebalancing_progress("first", start, self.TARGET)
+        
+        assert agent._calculate_rebalancing_progress("second", halfway, self.TARGET) == 0.0
+
+    def test_progress_is_clamped(self, agent):
+        """Test that drift beyond the starting drift reports zero, not negative."""
+        current = {"allocations": {"ETH": 100.0}, "initial_drift": 10.0}
+        
+        assert agent._calculate_rebalancing_progress("exec", current, self.TARGET) == 0.0
+
+    def test_no_target_reports_no_progress(self, agent):
+        """Test that progress is zero until there is a target to compare with."""
+        current = {"allocations": {"ETH": 100.0}}
+        
+        assert agent._calculate_rebalancing_progress("exec", current, {}) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_partial_rebalance_is_not_completed(self, agent):
+        """Test that a portfolio still off target is reported in progress."""
+        agent.invoke = AsyncMock(return_value=AIMessage(content="Keep going"))
+        start = {"allocations": {"ETH": 80.0, "USDC": 20.0}}
+        closer = {"allocations": {"ETH": 65.0, "USDC": 35.0}}
+        
+        first = await agent.monitor_rebalancing("exec", start, self.TARGET)
+        second = await agent.monitor_rebalancing("exec", closer, self.TARGET)
+        
+        assert first["status"] == second["status"] == "in_progress"
+        assert second["progress_percentage"] == pytest.approx(75.0)
+        assert second["ai_assessment"] == "Keep going"
+
+
+def _strategy_json(risk_score: int) -> dict:
+    """Parsed analysis of one strategy."""
+    return {"target_allocations": {"ETH": 50.0}, "risk_score": risk_score}
+
+
+class TestBatchedStrategyAnalysis:
+    """Test analyzing several strategies in one LLM call."""
+
+    PORTFOLIO = {"holdings": [{"symbol": "ETH", "value_usd": 100.0}]}
+
+    @pytest.mark.asyncio
+    async def test_all_strategies_in_one_call(self, agent):
+        """Test that a complete response needs no per-strategy calls."""
+        agent.invoke = AsyncMock(return_value=AIMessage(content=json.dumps({
+            "equal_weight": _strategy_json(3),
+            "risk_parity": _strategy_json(4)
+        })))
+        agent.batch_invoke = AsyncMock()
+        
+        strategies = await agent.analyze_rebalancing_strategies_batched(
+            self.PORTFOLIO, ["equal_weight", "risk_parity"]
+        )
+        
+        assert [s.name for s in strategies] == ["equal_weight", "risk_parity"]
+        assert [s.risk_score for s in strategies] == [3, 4]
+        agent.invoke.assert_awaited_once()
+        agent.batch_invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_strategy_falls_back(self, agent):
+        """Test that strategies absent from the response are analyzed separately."""
+        agent.invoke = AsyncMock(return_value=AIMessage(content=json.dumps({
+            "equal_weight": _strategy_json(3),
+            "risk_parity": "not an object"
+        })))
+        agent.batch_invoke = AsyncMock(return_value=[
+            AIMessage(content=json.dumps(_strategy_json(6)))
+        ])
+        
+        strategies = await agent.analyze_rebalancing_strategies_batched(
+            self.PORTFOLIO, ["equal_weight", "risk_parity"]
+        )
+        
+        assert [(s.name, s.risk_score) for s in strategies] == [
+            ("equal_weight", 3),
+            ("risk_parity", 6)
+        ]
+        assert len(agent.batch_invoke.await_args.args[0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_call_falls_back_for_all(self, agent):
+        """Test that a failed combined call analyzes every strategy separately."""
+        agent.invoke = AsyncMock(side_effect=RuntimeError("timeout"))
+        agent.batch_invoke = AsyncMock(return_value=[
+            AIMessage(content=json.dumps(_strategy_json(3))),
+            AIMessage(content=json.dumps(_strategy_json(4)))
+        ])
+        
+        strategies = await agent.analyze_rebalancing_strategies_batched(
+            self.PORTFOLIO, ["equal_weight", "risk_parity"]
+        )
+        
+        assert [s.name for s in strategies] == ["equal_weight", "risk_parity"]
+        assert len(agent.batch_invoke.await_args.args[0]) == 2
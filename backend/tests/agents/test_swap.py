@@ -0,0 +1,86 @@
+"""Tests for the swap agent."""
+
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents.swap import SwapAgent
+
+
+@pytest.fixture
+def agent():
+    """Swap agent with the LLM call mocked."""
+    agent = SwapAgent()
+    agent.invoke = AsyncMock(return_value=AIMessage(content="Analysis"))
+    return agent
+
+
+class TestPriceImpactCurve:
+    """Test constant-product price impact."""
+
+    def test_outputs_and_impact(self):
+        """Test outputs and impact against hand-computed values."""
+        # 100 in with a 0.3% fee: 99.7 reaches a 1000/2000 pool, so
+        # output = 2000 * 99.7 / 1099.7 and impact = 99.7 / 1099.7
+        outputs, impact_bps = SwapAgent._price_impact_curve(
+            np.array([100.0]), 1000.0, 2000.0, 30
+        )
+        
+        assert outputs[0] == pytest.approx(181.322178776)
+        assert impact_bps[0] == pytest.approx(906.610893880)
+
+    def test_feeless_swap_of_whole_reserve(self):
+        """Test that swapping the whole input reserve halves the price."""
+        outputs, impact_bps = SwapAgent._price_impact_curve(
+            np.array([0.0, 1000.0]), 1000.0, 2000.0, 0
+        )
+        
+        np.testing.assert_allclose(outputs, [0.0, 1000.0])
+        np.testing.assert_allclose(impact_bps, [0.0, 5000.0])
+
+
+class TestCalculatePriceImpact:
+    """Test price impact analysis."""
+
+    @pytest.mark.asyncio
+    async def test_numeric_only_returns_table(self, agent):
+        """Test that the computed table is returned without an LLM call."""
+        table = await agent.calculate_price_impact(
+            "ETH", "USDC", [100.0], reserves=(1000.0, 2000.0), numeric_only=True
+        )
+        
+        assert "| 100 | 181.322 | 9.07% |" in table
+        agent.invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_computed_table_is_interpreted(self, agent):
+        """Test that the model is given the computed table to interpret."""
+        result = await agent.calculate_price_impact(
+            "ETH", "USDC", [100.0], reserves=(1000.0, 2000.0)
+        )
+        
+        assert result == "Analysis"
+        assert "| 100 | 181.322 | 9.07% |" in agent.invoke.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_numeric_only_requires_reserves(self, agent):
+        """Test that numeric_only without reserves is rejected."""
+        with pytest.raises(ValueError):
+            await agent.calculate_price_impact("ETH", "USDC", [100.0], numeric_only=True)
+        
+        agent.invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("reserves, amounts", [
+        ((0.0, 2000.0), [100.0]),
+        ((1000.0, -1.0), [100.0]),
+        ((1000.0, 2000.0), [-1000.0]),
+    ])
+    async def test_invalid_pool_inputs_are_rejected(self, agent, reserves, amounts):
+        """Test that inputs that would produce NaN or inf tables are rejected."""
+        with pytest.raises(ValueError):
+            await agent.calculate_price_impact(
+                "ETH", "USDC", amounts, reserves=reserves, numeric_only=True
+            )
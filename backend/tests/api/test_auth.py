@@ -1,10 +1,13 @@
 """Tests for authentication endpoints."""
 
+import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 import pytest
+from fastapi import HTTPException, Request
 from fastapi.testclient import TestClient
 
+from app.core import auth
 from app.core.auth import create_access_token, verify_token, generate_nonce
 
 
@@ -196,4 +199,219 @@ class TestAuthentication:
         # Cookie should have security attributes
         cookie = response.cookies["access_token"]
         # Note: TestClient doesn't fully simulate cookie attributes,
-        # but in production these would be set
\ No newline at end of file
+        # but in production these would be set
+
+
+class TestVerifiedTokenCache:
+    """Test caching of verified JWTs."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start each test with an empty cache."""
+        auth._token_cache.clear()
+        yield
+        auth._token_cache.clear()
+
+    def test_repeated_verification_decodes_once(self):
+        """Test that a verified token is served from the cache."""
+        token = create_access_token(data={"address": "0xabc"})
+        
+        with patch.object(auth, "_decode_token", wraps=auth._decode_token) as decode:
+            first = verify_token(token)
+            second = verify_token(token)
+        
+        assert first.address == second.address == "0xabc"
+        assert decode.call_count == 1
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that rejected tokens are decoded again every time."""
+        with patch.object(auth, "_decode_token", wraps=auth._decode_token) as decode:
+            assert verify_token("not-a-token") is None
+            assert verify_token("not-a-token") is None
+        
+        assert decode.call_count == 2
+        assert not auth._token_cache
+
+    def test_entry_expires_with_the_token(self):
+        """Test that a cached token is not trusted past its own expiry."""
+        token = create_access_token(
+            data={"address": "0xabc"},
+            expires_delta=timedelta(seconds=30)
+        )
+        verify_token(token)
+        
+        with patch.object(auth, "_decode_token", wraps=auth._decode_token) as decode:
+            with patch.object(auth.time, "time", return_value=auth.time.time() + 31):
+                verify_token(token)
+        
+        assert decode.call_count == 1
+
+
+class TestSignedTokenCache:
+    """Test reuse of signed tokens for identical claims."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start each test with an empty cache."""
+        auth._signed_token_cache.clear()
+        yield
+        auth._signed_token_cache.clear()
+
+    @pytest.fixture
+    def frozen_now(self):
+        """Freeze the token issue time."""
+        now = datetime.now(auth.timezone.utc)
+        with patch.object(auth, "datetime", wraps=datetime) as mock_datetime:
+            mock_datetime.now.return_value = now
+            yield now
+
+    def test_identical_claims_are_signed_once(self, frozen_now):
+        """Test that identical claims within a second reuse the token."""
+        with patch.object(auth.jwt, "encode", wraps=auth.jwt.encode) as encode:
+            first = create_access_token(data={"address": "0xabc"})
+            second = create_access_token(data={"address": "0xabc"})
+        
+        assert first == second
+        assert encode.call_count == 1
+        assert verify_token(first).address == "0xabc"
+
+    def test_different_claims_are_signed_separately(self, frozen_now):
+        """Test that different claims never share a token."""
+        first = create_access_token(data={"address": "0xabc"})
+        second = create_access_token(data={"address": "0xdef"})
+        
+        assert first != second
+
+    def test_unhashable_claims_bypass_cache(self, frozen_now):
+        """Test that claims that can't be keyed are still signed."""
+        token = create_access_token(data={"address": "0xabc", "roles": ["admin"]})
+        
+        assert token
+        assert not auth._signed_token_cache
+
+    def test_cache_is_bounded(self, frozen_now):
+        """Test that the oldest signed token is evicted."""
+        with patch.object(auth, "SIGNED_TOKEN_CACHE_SIZE", 1):
+            create_access_token(data={"address": "0xabc"})
+            create_access_token(data={"address": "0xdef"})
+        
+        assert len(auth._signed_token_cache) == 1
+
+
+class TestNonceStore:
+    """Test bounded, expiring nonce storage."""
+
+    def test_set_replaces_previous_nonce(self):
+        """Test that only the latest nonce per address is kept."""
+        store = auth.NonceStore()
+        store.set("0xabc", "first")
+        store.set("0xabc", "second")
+        
+        assert store.get("0xabc") == "second"
+        assert len(store) == 1
+
+    def test_pop_consumes_nonce(self):
+        """Test that a nonce can only be used once."""
+        store = auth.NonceStore()
+        store.set("0xabc", "nonce")
+        
+        assert store.pop("0xabc") == "nonce"
+        assert store.pop("0xabc") is None
+
+    def test_oldest_nonce_is_evicted(self):
+        """Test that the store is bounded."""
+        store = auth.NonceStore(max_size=2)
+        store.set("0xa", "a")
+        store.set("0xb", "b")
+        store.set("0xc", "c")
+        
+        assert store.get("0xa") is None
+        assert store.get("0xc") == "c"
+        assert len(store) == 2
+
+    def test_expired_nonce_is_rejected(self):
+        """Test that nonces are not returned after the TTL."""
+        store = auth.NonceStore(ttl_seconds=300)
+        store.set("0xabc", "nonce")
+        
+        later = auth.time.monotonic() + 301
+        with patch.object(auth.time, "monotonic", return_value=later):
+            assert store.get("0xabc") is None
+
+    @pytest.mark.asyncio
+    async def test_nonces_expire_without_access(self):
+        """Test that the expiry timer removes nonces nobody reads again."""
+        store = auth.NonceStore(ttl_seconds=0.05)
+        store.set("0xa", "a")
+        await asyncio.sleep(0.03)
+        store.set("0xb", "b")
+        
+        await asyncio.sleep(0.04)
+        assert list(store._nonces) == ["0xb"]
+        
+        await asyncio.sleep(0.04)
+        assert not store._nonces
+        assert store._expiry_timer is None
+
+
+class TestBearerToken:
+    """Test the bearer token security scheme."""
+
+    @staticmethod
+    def _request(headers: dict) -> Request:
+        raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "headers": raw})
+
+    @pytest.mark.asyncio
+    async def test_returns_raw_token(self):
+        """Test that a bearer header resolves to the token string."""
+        token = await auth.security(self._request({"Authorization": "Bearer abc.def"}))
+        
+        assert token == "abc.def"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("headers", [
+        {},
+        {"Authorization": "Basic abc"},
+        {"Authorization": "Bearer "},
+    ])
+    async def test_missing_or_malformed_header_is_unauthorized(self, headers):
+        """Test that bad credentials raise a 401 with a Bearer challenge."""
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.security(self._request(headers))
+        
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.headers == {"WWW-Authenticate": "Bearer"}
+
+    @pytest.mark.asyncio
+    async def test_optional_scheme_returns_none(self):
+        """Test that the optional scheme allows anonymous requests."""
+        assert await auth.optional_security(self._request({})) is None
+
+
+class TestValidateEthereumAddress:
+    """Test Ethereum address validation."""
+
+    @pytest.mark.parametrize("address", [
+        "0x" + "ab" * 20,
+        "0x" + "AB" * 20,
+        "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed",
+    ])
+    def test_valid_addresses(self, address):
+        """Test that single-case and checksummed addresses are valid."""
+        assert auth.validate_ethereum_address(address)
+
+    @pytest.mark.parametrize("address", [
+        "0x" + "ab" * 19,
+        "0x" + "gg" * 20,
+        None,
+        12345,
+    ])
+    def test_invalid_addresses(self, address):
+        """Test that malformed and non-string inputs are invalid."""
+        assert not auth.validate_ethereum_address(address)
+
+    @pytest.mark.parametrize("address", [["0xabc"], {"address": "0xabc"}])
+    def test_unhashable_input_is_invalid(self, address):
+        """Test that unhashable input returns False instead of raising."""
+        assert not auth.validate_ethereum_address(address)
@@ -0,0 +1,186 @@
+"""Tests for chat API helpers."""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from pydantic import ValidationError
+
+from app.api import chat
+from app.core.auth import create_access_token
+
+
+class TestUtcTimestamp:
+    """Test the shared message timestamp."""
+
+    def test_timestamp_is_utc(self):
+        """Test that timestamps are timezone-aware UTC."""
+        parsed = datetime.fromisoformat(chat.utc_timestamp())
+        
+        assert parsed.utcoffset() == timedelta(0)
+
+    def test_timestamp_reused_within_a_second(self):
+        """Test that the formatted string is reused within the same second."""
+        with patch.object(chat.time, "time", return_value=1_700_000_000.1):
+            first = chat.utc_timestamp()
+        with patch.object(chat.time, "time", return_value=1_700_000_000.9):
+            second = chat.utc_timestamp()
+        
+        assert first is second
+        assert first == "2023-11-14T22:13:20+00:00"
+
+
+class TestHistoryMessageType:
+    """Test mapping stored messages to history entry types."""
+
+    def test_base_message_types(self):
+        """Test that each stored message class maps to its entry type."""
+        assert chat.history_message_type(HumanMessage(content="hi")) == "human"
+        assert chat.history_message_type(AIMessage(content="hi")) == "ai"
+        assert chat.history_message_type(SystemMessage(content="hi")) == "system"
+
+    def test_subclasses_map_to_base_type(self):
+        """Test that message subclasses are kept in history."""
+        assert chat.history_message_type(AIMessageChunk(content="hi")) == "ai"
+
+    def test_other_messages_are_skipped(self):
+        """Test that unrelated message types are not part of history."""
+        message = ToolMessage(content="result", tool_call_id="call_1")
+        
+        assert chat.history_message_type(message) is None
+
+
+class TestInboundChatMessage:
+    """Test parsing of WebSocket client frames."""
+
+    def test_defaults(self):
+        """Test that only content is required."""
+        message = chat.InboundChatMessage.model_validate_json('{"content": "Hi"}')
+        
+        assert message.content == "Hi"
+        assert message.stream is True
+        assert message.metadata == {}
+
+    def test_unknown_fields_are_ignored(self):
+        """Test that extra client fields such as type are accepted."""
+        message = chat.InboundChatMessage.model_validate_json(
+            '{"type": "user_message", "content": "Hi", "stream": false}'
+        )
+        
+        assert message.content == "Hi"
+        assert message.stream is False
+
+    def test_metadata_default_is_not_shared(self):
+        """Test that each message gets its own metadata dict."""
+        first = chat.InboundChatMessage(content="a")
+        first.metadata["seen"] = True
+        
+        assert chat.InboundChatMessage(content="b").metadata == {}
+
+    @pytest.mark.parametrize("data, error_type", [
+        ('{"content": ', "json_invalid"),
+        ('{"type": "user_message"}', "missing"),
+        ('{"content": 123}', "string_type"),
+        ('{"content": "Hi", "metadata": []}', "dict_type"),
+    ])
+    def test_invalid_frames(self, data, error_type):
+        """Test the error types the WebSocket handler maps to messages."""
+        with pytest.raises(ValidationError) as exc_info:
+            chat.InboundChatMessage.model_validate_json(data)
+        
+        assert exc_info.value.errors()[0]["type"] == error_type
+
+
+class TestSendBatch:
+    """Test sending one workflow step's messages per frame."""
+
+    @pytest.mark.asyncio
+    async def test_single_message_is_sent_as_object(self):
+        """Test that a lone message keeps the plain object frame format."""
+        websocket = AsyncMock()
+        
+        await chat.send_batch(websocket, [chat.ChatMessage(type="ai_response", content="Hi")])
+        
+        frame = json.loads(websocket.send_text.await_args.args[0])
+        assert frame["content"] == "Hi"
+
+    @pytest.mark.asyncio
+    async def test_several_messages_share_one_frame(self):
+        """Test that messages from one step are sent as an ordered array."""
+        websocket = AsyncMock()
+        event = {
+            "route_query": {
+                "current_agent": "general",
+                "routing_result": {"confidence": 0.9}
+            },
+            "general_agent": {
+                "messages": [AIMessage(content="Answer", additional_kwargs={"agent": "General"})]
+            }
+        }
+        
+        await chat.send_batch(websocket, chat.workflow_event_messages(event))
+        
+        websocket.send_text.assert_awaited_once()
+        frame = json.loads(websocket.send_text.await_args.args[0])
+        assert [message["type"] for message in frame] == ["routing", "ai_response"]
+        assert frame[1]["metadata"]["agent"] == "General"
+
+    @pytest.mark.asyncio
+    async def test_empty_step_sends_nothing(self):
+        """Test that steps without messages produce no frame."""
+        websocket = AsyncMock()
+        
+        await chat.send_batch(websocket, [])
+        
+        websocket.send_text.assert_not_called()
+
+
+class TestChatHistory:
+    """Test the chat history endpoint."""
+
+    @pytest.fixture
+    def history_client(self, client):
+        """Client authenticated as the owner of session "s1"."""
+        token = create_access_token(data={"address": "0xabc"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        with patch.dict(chat.user_sessions, {"0xabc": "s1"}):
+            yield client
+
+    def test_history_entries(self, history_client):
+        """Test that stored messages are returned with their entry types."""
+        messages = [
+            HumanMessage(content="Hi"),
+            AIMessageChunk(content="Hello"),
+            ToolMessage(content="result", tool_call_id="call_1"),
+        ]
+        memory = chat.memory_manager
+        with patch.object(
+            memory, "get_messages_for_context", AsyncMock(return_value=messages)
+        ), patch.object(
+            memory, "get_session_metrics", AsyncMock(return_value={"message_count": 3})
+        ):
+            response = history_client.get("/api/chat/sessions/s1/history")
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "session_id": "s1",
+            "messages": [
+                {"type": "human", "content": "Hi", "metadata": {}},
+                {"type": "ai", "content": "Hello", "metadata": {}},
+            ],
+            "metrics": {"message_count": 3}
+        }
+
+    def test_other_users_session_is_forbidden(self, history_client):
+        """Test that a user can't read another session's history."""
+        response = history_client.get("/api/chat/sessions/s2/history")
+        
+        assert response.status_code == 403
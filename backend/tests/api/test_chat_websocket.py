@@ -28,9 +28,9 @@ class TestChatWebSocket:
                 "content": "Hello, test message"
             })
             
-            # Should receive typing indicator
+            # Streamed turns start with routing info instead of a typing indicator
             data = websocket.receive_json()
-            assert data["type"] == "typing"
+            assert data["type"] == "routing"
 
     def test_websocket_connection_authenticated(self, client: TestClient, test_jwt_token: str):
         """Test WebSocket connection with authentication."""
@@ -116,6 +116,27 @@ class TestChatWebSocket:
             assert data["type"] == "error"
             assert "Invalid message format" in data["content"]
 
+    def test_websocket_malformed_json(self, client: TestClient):
+        """Test WebSocket with a frame that isn't valid JSON."""
+        client_id = "test-client-123"
+        
+        with client.websocket_connect(f"/api/chat/ws/{client_id}") as websocket:
+            # Skip welcome message
+            websocket.receive_json()
+            
+            websocket.send_text('{"content": ')
+            
+            data = websocket.receive_json()
+            assert data["type"] == "error"
+            assert data["content"] == "Invalid JSON message"
+            
+            # The connection stays usable after a rejected frame
+            websocket.send_text(json.dumps({"content": 123}))
+            
+            data = websocket.receive_json()
+            assert data["type"] == "error"
+            assert data["content"].startswith("Invalid message format: ")
+
     def test_websocket_session_id_generation(self, client: TestClient, test_jwt_token: str):
         """Test session ID generation for authenticated and unauthenticated users."""
         # Test unauthenticated session ID
@@ -222,11 +243,7 @@ class TestChatWebSocket:
                 "stream": True
             }))
             
-            # Should receive typing indicator
-            data = websocket.receive_json()
-            assert data["type"] == "typing"
-            
-            # Should receive routing info
+            # Should receive routing info (no separate typing indicator)
             data = websocket.receive_json()
             assert data["type"] == "routing"
             assert data["metadata"]["selected_agent"] == "portfolio"
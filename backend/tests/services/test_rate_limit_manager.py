@@ -0,0 +1,136 @@
+"""Tests for the rate limit manager."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.rate_limit_manager import (
+    RateLimitManager,
+    RateLimitType,
+    TokenBucket,
+)
+
+
+class TestTokenBucket:
+    """Test token bucket pacing."""
+
+    @pytest.mark.asyncio
+    async def test_burst_up_to_capacity_does_not_wait(self):
+        """Test that a full bucket serves a burst immediately."""
+        bucket = TokenBucket(rate=1.0, capacity=10)
+        
+        start = time.monotonic()
+        results = await asyncio.gather(*[bucket.consume(1) for _ in range(10)])
+        
+        assert all(results)
+        assert time.monotonic() - start < 0.1
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_wait_exceeds_max_wait(self):
+        """Test that a consume that would wait too long is rejected without taking units."""
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        assert await bucket.consume(1)
+        
+        assert not await bucket.consume(1, max_wait=0.1)
+        
+        # The rejected call reserved nothing
+        assert bucket._available == pytest.approx(0.0, abs=0.05)
+
+    @pytest.mark.asyncio
+    async def test_waiters_do_not_block_each_other(self):
+        """Test that waiting callers sleep concurrently rather than one at a time."""
+        bucket = TokenBucket(rate=20.0, capacity=1)
+        assert await bucket.consume(1)
+        
+        start = time.monotonic()
+        waiter = asyncio.create_task(bucket.consume(1, max_wait=1.0))
+        await asyncio.sleep(0)
+        
+        # Queued behind the waiter, but a quick rejection isn't held up by it
+        assert not await bucket.consume(1, max_wait=0.01)
+        assert time.monotonic() - start < 0.04
+        assert await waiter
+
+    def test_refund_is_capped_at_capacity(self):
+        """Test that refunds never overfill the bucket."""
+        bucket = TokenBucket(rate=1.0, capacity=5)
+        
+        bucket.refund(3)
+        
+        assert bucket._available == 5
+
+
+class TestRateLimitManager:
+    """Test rate limit acquisition."""
+
+    @pytest.mark.asyncio
+    async def test_fallback_limits_allow_concurrent_burst(self):
+        """Test that fallback limits don't serialize concurrent requests."""
+        manager = RateLimitManager()
+        
+        start = time.monotonic()
+        results = await asyncio.gather(*[
+            manager.acquire("unknown/model", tokens=100) for _ in range(5)
+        ])
+        
+        assert all(results)
+        assert time.monotonic() - start < 0.5
+
+    def test_bucket_holds_a_few_seconds_of_allowance(self):
+        """Test that burst capacity is BURST_SECONDS of the per-minute rate."""
+        manager = RateLimitManager()
+        manager.set_model_limits("test/model", {
+            RateLimitType.REQUESTS_PER_MINUTE: 600,
+            RateLimitType.TOKENS_PER_MINUTE: 6,
+        })
+        buckets = manager._get_buckets("test/model")
+        
+        request_bucket = buckets[RateLimitType.REQUESTS_PER_MINUTE]
+        assert request_bucket.rate == 10
+        assert request_bucket.capacity == 10 * manager.BURST_SECONDS
+        # Very low limits still let a single unit through
+        assert buckets[RateLimitType.TOKENS_PER_MINUTE].capacity == 1
+
+    @pytest.mark.asyncio
+    async def test_burst_beyond_capacity_is_paced(self):
+        """Test that requests past the burst size wait for the bucket to refill."""
+        manager = RateLimitManager()
+        manager.set_model_limits("test/model", {
+            RateLimitType.REQUESTS_PER_MINUTE: 60,
+        })
+        
+        for _ in range(manager.BURST_SECONDS):
+            assert await manager._pace("test/model", tokens=None, max_wait=0.1)
+        
+        assert not await manager._pace("test/model", tokens=None, max_wait=0.1)
+
+    @pytest.mark.asyncio
+    async def test_rejected_acquire_refunds_request_unit(self):
+        """Test that a request rejected by the window check gives back its paced unit."""
+        manager = RateLimitManager()
+        manager.set_model_limits("test/model", {
+            RateLimitType.REQUESTS_PER_MINUTE: 60,
+            RateLimitType.TOKENS_PER_MINUTE: 100,
+        })
+        request_bucket = manager._get_buckets("test/model")[RateLimitType.REQUESTS_PER_MINUTE]
+        
+        # More tokens than the per-minute window allows
+        assert not await manager.acquire("test/model", tokens=500, max_wait=0.5)
+        
+        assert request_bucket._available == pytest.approx(5, abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_rejection_refunds_request_unit(self):
+        """Test that running out of token budget gives back the request unit."""
+        manager = RateLimitManager()
+        manager.set_model_limits("test/model", {
+            RateLimitType.REQUESTS_PER_MINUTE: 60,
+            RateLimitType.TOKENS_PER_MINUTE: 60,
+        })
+        buckets = manager._get_buckets("test/model")
+        buckets[RateLimitType.TOKENS_PER_MINUTE]._available = 0
+        
+        assert not await manager._pace("test/model", tokens=30, max_wait=1.0)
+        
+        assert buckets[RateLimitType.REQUESTS_PER_MINUTE]._available == pytest.approx(5, abs=0.01)
@@ -8,6 +8,8 @@ export interface ChatMessage {
 }
 
 export interface ChatWebSocketMessage {
+  // Omitted by the server for transient typing and routing events
+  id?: string
   type: 'user_message' | 'ai_response' | 'error'
   content: string
   timestamp: string
@@ -72,9 +74,13 @@ export class ChatWebSocketClient {
       
       this.ws.onmessage = (event) => {
         try {
-          const message = JSON.parse(event.data) as ChatWebSocketMessage
+          // Messages produced in the same workflow step arrive as an array
+          const data = JSON.parse(event.data) as ChatWebSocketMessage | ChatWebSocketMessage[]
+          const messages = Array.isArray(data) ? data : [data]
           if (this.onMessageCallback) {
-            this.onMessageCallback(message)
+            for (const message of messages) {
+              this.onMessageCallback(message)
+            }
           }
         } catch (error) {
           console.error('Failed to parse WebSocket message:', error)